@@ -0,0 +1,54 @@
+"""Redução de pontos para os gráficos de linha.
+
+Implementa o Largest-Triangle-Three-Buckets (LTTB): a série é dividida em
+baldes e, de cada balde, fica o ponto que forma o maior triângulo com o ponto
+escolhido no balde anterior e a média do balde seguinte. Picos e vales são
+preservados com uma fração dos pontos.
+"""
+import numpy as np
+
+# Pontos enviados ao navegador por gráfico
+PONTOS_GRAFICO = 1500
+
+
+def lttb(x, y, limite=PONTOS_GRAFICO):
+    """Índices dos pontos mantidos pelo LTTB, em ordem crescente.
+
+    ``x`` precisa ser numérico e crescente (datas podem ser passadas como
+    ``datetime64``). Séries com até ``limite`` pontos são mantidas inteiras.
+    """
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    x = np.asarray(x).astype('float64')
+    y = np.asarray(y, dtype='float64')
+
+    # Primeiro e último ponto ficam sempre; o resto é dividido em limite - 2 baldes
+    limites = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0] = 0
+    escolhidos[-1] = n - 1
+
+    # Média de cada balde, usada como terceiro vértice do triângulo
+    somas_x = np.concatenate([[0.0], np.cumsum(x)])
+    somas_y = np.concatenate([[0.0], np.cumsum(y)])
+    inicios = np.append(limites[1:-1], n - 1)
+    fins = np.append(limites[2:], n)
+    medias_x = (somas_x[fins] - somas_x[inicios]) / (fins - inicios)
+    medias_y = (somas_y[fins] - somas_y[inicios]) / (fins - inicios)
+
+    anterior = 0
+    for balde in range(limite - 2):
+        inicio, fim = limites[balde], limites[balde + 1]
+        xa, ya = x[anterior], y[anterior]
+        areas = np.abs((xa - medias_x[balde]) * (y[inicio:fim] - ya) - (xa - x[inicio:fim]) * (medias_y[balde] - ya))
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[balde + 1] = anterior
+    return escolhidos
+
+
+def reduzir_serie(serie, limite=PONTOS_GRAFICO):
+    """Série com no máximo ``limite`` pontos, escolhidos pelo LTTB."""
+    indices = lttb(serie.index.to_numpy(dtype='datetime64[ns]').astype('int64'), serie.to_numpy(), limite)
+    return serie.iloc[indices]
@@ -0,0 +1,97 @@
+"""Métricas de avaliação das previsões.
+
+As previsões e os valores reais são alinhados pela data (``ds``) com busca
+binária, e todas as métricas saem de uma única passada NumPy sobre os
+arrays alinhados, sem colunas temporárias em DataFrames.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Resultados já calculados, por chave do modelo ajustado
+LIMITE_CACHE = 32
+_cache_metricas = OrderedDict()
+# As sessões do Streamlit rodam em threads e compartilham o cache
+_lock_metricas = threading.Lock()
+
+
+def alinhar(previsao, df_real):
+    """Arrays de real e previsto nas datas presentes nos dois DataFrames.
+
+    Ambos precisam estar ordenados por ``ds``. Retorna ``ds``, ``y``,
+    ``yhat``, ``yhat_lower`` e ``yhat_upper``.
+    """
+    ds_previsao = previsao['ds'].to_numpy(dtype='datetime64[ns]')
+    ds_real = df_real['ds'].to_numpy(dtype='datetime64[ns]')
+
+    posicoes = np.searchsorted(ds_previsao, ds_real)
+    validos = posicoes < len(ds_previsao)
+    validos[validos] = ds_previsao[posicoes[validos]] == ds_real[validos]
+    posicoes = posicoes[validos]
+
+    return (
+        ds_real[validos],
+        df_real['y'].to_numpy(dtype='float64')[validos],
+        previsao['yhat'].to_numpy(dtype='float64')[posicoes],
+        previsao['yhat_lower'].to_numpy(dtype='float64')[posicoes],
+        previsao['yhat_upper'].to_numpy(dtype='float64')[posicoes],
+    )
+
+
+def calcular_metricas(y, yhat, yhat_lower=None, yhat_upper=None):
+    """MAPE (%), R², RMSE, MAE e cobertura do intervalo (%)."""
+    n = len(y)
+    if n == 0:
+        return {'mape': np.nan, 'r2': np.nan, 'rmse': np.nan, 'mae': np.nan, 'cobertura': np.nan, 'n': 0}
+
+    erro = y - yhat
+    erro_abs = np.abs(erro)
+    desvio = y - y.mean()
+    ss_residual = erro @ erro
+    ss_total = desvio @ desvio
+
+    metricas = {
+        'mape': float(np.mean(erro_abs / np.abs(y)) * 100),
+        'r2': float(1 - ss_residual / ss_total) if ss_total > 0 else np.nan,
+        'rmse': float(np.sqrt(ss_residual / n)),
+        'mae': float(erro_abs.mean()),
+        'cobertura': np.nan,
+        'n': n,
+    }
+    if yhat_lower is not None and yhat_upper is not None:
+        metricas['cobertura'] = float(np.mean((y >= yhat_lower) & (y <= yhat_upper)) * 100)
+    return metricas
+
+
+def avaliar(previsao, df_real, chave=None):
+    """Métricas de ``previsao`` contra ``df_real``, memorizadas por ``chave``."""
+    if chave is not None:
+        with _lock_metricas:
+            if chave in _cache_metricas:
+                _cache_metricas.move_to_end(chave)
+                return _cache_metricas[chave]
+
+    _, y, yhat, yhat_lower, yhat_upper = alinhar(previsao, df_real)
+    metricas = calcular_metricas(y, yhat, yhat_lower, yhat_upper)
+
+    if chave is not None:
+        with _lock_metricas:
+            _cache_metricas[chave] = metricas
+            _cache_metricas.move_to_end(chave)
+            if len(_cache_metricas) > LIMITE_CACHE:
+                _cache_metricas.popitem(last=False)
+    return metricas
+
+
+def detalhar(previsao, df_real):
+    """Tabela diária de previsto x realizado, da data mais recente para a mais antiga."""
+    ds, y, yhat, _, _ = alinhar(previsao, df_real)
+    ordem = slice(None, None, -1)
+    return pd.DataFrame({
+        'Data': pd.DatetimeIndex(ds[ordem]).strftime('%Y-%m-%d'),
+        'Previsão': np.round(yhat[ordem], 2),
+        'Realizado': y[ordem],
+        'Erro percentual absoluto': np.abs((y[ordem] - yhat[ordem]) / y[ordem]) * 100,
+    })
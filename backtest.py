@@ -0,0 +1,238 @@
+"""Backtest com origem móvel (walk-forward) dos motores de previsão.
+
+Para cada data de corte, o motor (Prophet, por padrão) é ajustado com os dados de ``inicio`` até o
+corte e avaliado nos ``horizonte`` pregões seguintes. Os cortes rodam em
+paralelo num pool de processos, as métricas são devolvidas à medida que cada
+corte termina e gravadas num checkpoint JSONL, de forma que uma execução
+interrompida retoma de onde parou.
+
+Uso:
+    python backtest.py --cortes 200 --processos 8
+    python backtest.py --cortes 200 --motor suavizacao
+"""
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from avaliacao import calcular_metricas
+from dados import PASTA_CACHE, carregar_cotacoes
+from modelo import INICIO_TREINO, carregar_configuracao, chave_modelo, preparar_treino
+from motores import MOTORES, criar_motor
+from previsoes import HORIZONTE_MAXIMO
+
+PASTA_BACKTESTS = os.path.join(PASTA_CACHE, "backtests")
+
+# Quantidade mínima de pregões no treino do primeiro corte
+MINIMO_TREINO = 250
+# Datas de corte por padrão (linha de comando e página de previsão)
+CORTES_PADRAO = 100
+
+# Série compartilhada pelos processos do pool (definida no inicializador)
+_ds = None
+_y = None
+
+
+def gerar_cortes(datas, n_cortes, inicio=INICIO_TREINO, horizonte=HORIZONTE_MAXIMO, minimo_treino=MINIMO_TREINO):
+    """Escolhe ``n_cortes`` datas igualmente espaçadas entre os pregões elegíveis.
+
+    Um corte é elegível se tiver ao menos ``minimo_treino`` pregões desde
+    ``inicio`` e ``horizonte`` pregões depois dele.
+    """
+    datas = pd.DatetimeIndex(datas)
+    datas = datas[datas >= pd.Timestamp(inicio)]
+    elegiveis = datas[minimo_treino - 1:len(datas) - horizonte]
+    if len(elegiveis) == 0 or n_cortes <= 0:
+        return []
+    posicoes = np.unique(np.linspace(0, len(elegiveis) - 1, min(n_cortes, len(elegiveis))).round().astype(int))
+    return list(elegiveis[posicoes])
+
+
+def iniciar_processo(ds, y, motor='prophet'):
+    """Inicializador do pool: guarda a série e prepara o Prophet no processo."""
+    global _ds, _y
+    _ds, _y = ds, y
+    if motor != 'prophet':
+        return
+    # Importa o Prophet uma vez por processo e silencia o log de cada ajuste
+    from cmdstanpy.utils import get_logger
+    from prophet import Prophet  # noqa: F401
+    get_logger().setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+
+def avaliar_corte(ds, y, corte, inicio=INICIO_TREINO, parametros=None, horizonte=HORIZONTE_MAXIMO, motor='prophet'):
+    """Ajusta ``motor`` até ``corte`` e avalia nos ``horizonte`` pregões seguintes.
+
+    ``parametros`` são os do motor; ``None`` usa os padrões dele.
+    """
+    corte = np.datetime64(pd.Timestamp(corte), 'ns')
+    primeiro = np.searchsorted(ds, np.datetime64(pd.Timestamp(inicio), 'ns'))
+    fim_treino = np.searchsorted(ds, corte, side='right')
+
+    df_treino = pd.DataFrame({'ds': ds[primeiro:fim_treino], 'y': y[primeiro:fim_treino]})
+    datas_teste = ds[fim_treino:fim_treino + horizonte]
+    y_teste = y[fim_treino:fim_treino + horizonte]
+
+    motor_ajustado = criar_motor(motor, parametros).ajustar(df_treino)
+    previsao = motor_ajustado.prever(len(datas_teste), datas=datas_teste, dentro_amostra=False)
+
+    metricas = calcular_metricas(
+        y_teste,
+        previsao['yhat'].to_numpy(),
+        previsao['yhat_lower'].to_numpy(),
+        previsao['yhat_upper'].to_numpy(),
+    )
+    metricas['corte'] = pd.Timestamp(corte).strftime('%Y-%m-%d')
+    return metricas
+
+
+def avaliar_corte_no_processo(corte, inicio, parametros, horizonte, motor='prophet'):
+    """``avaliar_corte`` sobre a série recebida por ``iniciar_processo``."""
+    return avaliar_corte(_ds, _y, corte, inicio, parametros, horizonte, motor)
+
+
+def caminho_checkpoint(df_cotacoes, inicio=INICIO_TREINO, parametros=None, horizonte=HORIZONTE_MAXIMO, motor='prophet'):
+    """Checkpoint padrão, identificado pelos dados, pelo motor e pela configuração."""
+    parametros = MOTORES[motor]['parametros'] if parametros is None else parametros
+    configuracao = {**parametros, 'horizonte': horizonte}
+    if motor != 'prophet':
+        configuracao['motor'] = motor
+    chave = chave_modelo(preparar_treino(df_cotacoes, inicio), configuracao)
+    return os.path.join(PASTA_BACKTESTS, chave + '.jsonl')
+
+
+def ler_checkpoint(caminho):
+    """Resultados já gravados, por data de corte."""
+    resultados = {}
+    if caminho and os.path.exists(caminho):
+        with open(caminho) as arquivo:
+            for linha in arquivo:
+                try:
+                    resultado = json.loads(linha)
+                except json.JSONDecodeError:
+                    # Linha truncada por uma interrupção durante a escrita
+                    continue
+                resultados[resultado['corte']] = resultado
+    return resultados
+
+
+def executar_backtest(df_cotacoes, cortes, inicio=INICIO_TREINO, parametros=None, horizonte=HORIZONTE_MAXIMO,
+                      processos=None, checkpoint=None, motor='prophet'):
+    """Executa o backtest e devolve as métricas de cada corte conforme terminam.
+
+    Os cortes já presentes no ``checkpoint`` não são refeitos: seus
+    resultados são devolvidos primeiro. Com ``processos=1`` tudo roda no
+    processo atual.
+    """
+    parametros = MOTORES[motor]['parametros'] if parametros is None else parametros
+    concluidos = ler_checkpoint(checkpoint)
+    pendentes = []
+    for corte in cortes:
+        chave = pd.Timestamp(corte).strftime('%Y-%m-%d')
+        if chave in concluidos:
+            yield concluidos[chave]
+        else:
+            pendentes.append(corte)
+    if not pendentes:
+        return
+
+    ds = df_cotacoes.index.to_numpy(dtype='datetime64[ns]')
+    y = df_cotacoes['Preço'].to_numpy(dtype='float64')
+
+    arquivo = None
+    if checkpoint:
+        os.makedirs(os.path.dirname(os.path.abspath(checkpoint)), exist_ok=True)
+        arquivo = open(checkpoint, 'a')
+
+    def registrar(resultado):
+        if arquivo is not None:
+            arquivo.write(json.dumps(resultado) + '\n')
+            arquivo.flush()
+        return resultado
+
+    try:
+        if processos == 1:
+            iniciar_processo(ds, y, motor)
+            for corte in pendentes:
+                yield registrar(avaliar_corte_no_processo(corte, inicio, parametros, horizonte, motor))
+            return
+
+        with ProcessPoolExecutor(max_workers=processos, initializer=iniciar_processo, initargs=(ds, y, motor)) as pool:
+            tarefas = [pool.submit(avaliar_corte_no_processo, corte, inicio, parametros, horizonte, motor)
+                       for corte in pendentes]
+            try:
+                for tarefa in as_completed(tarefas):
+                    yield registrar(tarefa.result())
+            finally:
+                for tarefa in tarefas:
+                    tarefa.cancel()
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+
+
+def resumir(resultados):
+    """Média das métricas de todos os cortes."""
+    df = pd.DataFrame(list(resultados))
+    if df.empty:
+        return pd.Series(dtype='float64')
+    return df[['mape', 'r2', 'rmse', 'mae', 'cobertura']].mean()
+
+
+def metricas_backtest(df_cotacoes, inicio=INICIO_TREINO, parametros=None, horizonte=HORIZONTE_MAXIMO,
+                      motor='prophet', n_cortes=CORTES_PADRAO, calcular=True):
+    """Médias do backtest de ``motor`` nos cortes padrão, ou ``None`` se não houver.
+
+    Com ``calcular=True`` os cortes rodam no processo atual, sem checkpoint.
+    Com ``calcular=False`` nada é ajustado: só vale o checkpoint padrão
+    gravado por ``backtest.py``, e só se tiver todos os cortes.
+    """
+    cortes = gerar_cortes(df_cotacoes.index, n_cortes, inicio, horizonte)
+    if not cortes:
+        return None
+    if calcular:
+        return resumir(executar_backtest(df_cotacoes, cortes, inicio, parametros, horizonte, processos=1, motor=motor))
+    concluidos = ler_checkpoint(caminho_checkpoint(df_cotacoes, inicio, parametros, horizonte, motor))
+    resultados = [concluidos.get(pd.Timestamp(corte).strftime('%Y-%m-%d')) for corte in cortes]
+    if None in resultados:
+        return None
+    return resumir(resultados)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Backtest walk-forward dos motores de previsão do Brent")
+    parser.add_argument('--motor', choices=list(MOTORES), default='prophet', help="motor de previsão avaliado")
+    parser.add_argument('--cortes', type=int, default=CORTES_PADRAO, help="quantidade de datas de corte")
+    parser.add_argument('--inicio', default=None, help="início da janela de treino (padrão: o da página)")
+    parser.add_argument('--horizonte', type=int, default=HORIZONTE_MAXIMO, help="pregões avaliados após cada corte")
+    parser.add_argument('--processos', type=int, default=None, help="processos no pool (padrão: todos os núcleos)")
+    parser.add_argument('--checkpoint', default=None, help="arquivo JSONL de checkpoint")
+    parser.add_argument('--offline', action='store_true', help="não busca dados novos no yfinance")
+    args = parser.parse_args(argumentos)
+
+    # Usa a mesma configuração da página de previsão; os motores leves usam os próprios parâmetros padrão
+    inicio, parametros = carregar_configuracao()
+    inicio = args.inicio or inicio
+    if args.motor != 'prophet':
+        parametros = None
+
+    df_cotacoes = carregar_cotacoes(atualizar=not args.offline)
+    cortes = gerar_cortes(df_cotacoes.index, args.cortes, inicio, args.horizonte)
+    checkpoint = args.checkpoint or caminho_checkpoint(df_cotacoes, inicio, parametros, args.horizonte, args.motor)
+
+    resultados = []
+    for resultado in executar_backtest(df_cotacoes, cortes, inicio, parametros, args.horizonte, args.processos, checkpoint,
+                                       args.motor):
+        resultados.append(resultado)
+        print(f"[{len(resultados)}/{len(cortes)}] corte {resultado['corte']}: MAPE {resultado['mape']:.2f}%", flush=True)
+
+    print(resumir(resultados).round(4).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""Benchmark dos caminhos quentes da aplicação, sem rede.
+
+Mede cada etapa sobre a série do ``ipea.csv`` e sobre séries sintéticas
+(passeio aleatório em minutos, com semente fixa) de tamanhos configuráveis:
+- carga da base (CSV do IPEA ou Parquet) e atualização incremental, com o
+  download do yfinance substituído pelos dias finais da própria série;
+- filtro (no DataFrame e na série compartilhada), índice de intervalos,
+  variações, LTTB e consulta de datas da página de dados históricos;
+- ajuste e previsão de cada motor (o Prophet só com ``--prophet`` e em
+  séries de até ``LIMITE_PROPHET`` linhas), e o reajuste do Prophet com
+  ``DIAS_NOVOS`` dias a mais, do zero e reaproveitando o ajuste anterior;
+- avaliação e detalhamento das previsões.
+
+Cada etapa roda uma vez para aquecer, ``--repeticoes`` vezes cronometrada
+(tempo de relógio e de CPU) e uma última vez sob ``tracemalloc`` para o pico
+de memória, que fica fora da cronometragem. O resultado pode ser gravado em
+JSON e comparado com o de uma execução anterior.
+
+Uso:
+    python benchmark.py --linhas 100000 1000000 --json atual.json
+    python benchmark.py --json atual.json --comparar anterior.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import dados
+from amostragem import reduzir_serie
+from avaliacao import avaliar, detalhar
+from consulta_datas import precos_em
+from indice_precos import IndicePrecos
+from modelo import INICIO_TREINO, ajustar_incremental, ajustar_modelo, preparar_treino
+from motores import MOTORES, prever_com_motor
+from serie_precos import SeriePrecos
+from tabela import calcular_variacoes
+
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+SEMENTE = 42
+LINHAS_SINTETICAS = [100_000, 1_000_000]
+REPETICOES = 5
+
+# Consultas feitas por repetição nas etapas de consulta
+CONSULTAS = 1000
+
+# Dias "baixados" na etapa de atualização incremental
+DIAS_NOVOS = 5
+
+# Acima disso o ajuste do Prophet leva minutos e fica fora do benchmark
+LIMITE_PROPHET = 5000
+
+# Etapas mais lentas que a base em mais que a tolerância (e mais que o ruído mínimo) são regressões
+TOLERANCIA = 0.2
+RUIDO_MINIMO = 0.001
+
+
+def serie_sintetica(linhas, semente=SEMENTE):
+    """``df_cotacoes`` sintético: passeio aleatório geométrico com um preço por minuto."""
+    rng = np.random.default_rng(semente)
+    precos = 60 * np.exp(np.cumsum(rng.normal(0, 5e-4, linhas)))
+    datas = pd.date_range('2000-01-03', periods=linhas, freq='min', name='Date')
+    return pd.DataFrame({'Preço': precos}, index=datas)
+
+
+def medir(funcao, repeticoes=REPETICOES, preparar=None):
+    """Tempos (s) e pico de memória (bytes) de ``funcao``.
+
+    ``preparar``, se houver, roda antes de cada chamada, fora da medição.
+    """
+    def chamar():
+        argumentos = preparar() if preparar is not None else ()
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        funcao(*argumentos)
+        return time.perf_counter() - inicio, time.process_time() - inicio_cpu
+
+    chamar()
+    tempos, cpus = zip(*(chamar() for _ in range(repeticoes)))
+
+    argumentos = preparar() if preparar is not None else ()
+    tracemalloc.start()
+    try:
+        funcao(*argumentos)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'tempo_mediano': float(np.median(tempos)),
+        'tempo_minimo': float(np.min(tempos)),
+        'cpu_mediano': float(np.median(cpus)),
+        'memoria_pico': int(pico),
+        'repeticoes': repeticoes,
+    }
+
+
+@contextmanager
+def _download_local(novos):
+    # Troca o download do yfinance pelos dias em ``novos``, sem acesso à rede
+    original = dados._baixar_cotacoes
+    dados._baixar_cotacoes = lambda indice, inicio, fim: novos[(novos.index >= inicio) & (novos.index < fim)]
+    try:
+        yield
+    finally:
+        dados._baixar_cotacoes = original
+
+
+def etapas_carga(nome, df_cotacoes, pasta):
+    """Etapas de leitura da base e de atualização incremental."""
+    etapas = {}
+    if nome == 'ipea':
+        etapas['carga_csv'] = (lambda: dados._ler_ipea(), None)
+
+    caminho = os.path.join(pasta, f'{nome}.parquet')
+    df_cotacoes.to_parquet(caminho)
+    etapas['carga_parquet'] = (lambda: pd.read_parquet(caminho), None)
+
+    # A base começa sem os últimos dias, que chegam pelo "download"
+    base = df_cotacoes.iloc[:-DIAS_NOVOS]
+    novos = df_cotacoes.iloc[-DIAS_NOVOS:]
+    caminho_atualizacao = os.path.join(pasta, f'{nome}_atualizacao.parquet')
+    hoje = df_cotacoes.index[-1] + pd.Timedelta(days=3)
+
+    def preparar():
+        base.to_parquet(caminho_atualizacao)
+        return ()
+
+    def atualizar():
+        with _download_local(novos):
+            dados.atualizar_base('local', caminho_atualizacao, hoje, semente=None)
+
+    etapas['atualizacao_base'] = (atualizar, preparar)
+    return etapas
+
+
+def etapas_historico(df_cotacoes):
+    """Etapas da página de dados históricos."""
+    rng = np.random.default_rng(SEMENTE)
+    datas = df_cotacoes.index
+    quartil, terceiro_quartil = datas[len(datas) // 4], datas[3 * len(datas) // 4]
+    indice_precos = IndicePrecos.de_dataframe(df_cotacoes)
+    serie_precos = SeriePrecos.de_dataframe(df_cotacoes)
+
+    posicoes = np.sort(rng.integers(0, len(datas), size=(CONSULTAS, 2)), axis=1)
+    intervalos = list(zip(datas[posicoes[:, 0]], datas[posicoes[:, 1]]))
+    consultas = datas[rng.integers(0, len(datas), CONSULTAS)]
+
+    def consultar_intervalos():
+        for inicio, fim in intervalos:
+            indice_precos.intervalo(inicio, fim)
+
+    return {
+        'filtro_periodo': (lambda: df_cotacoes.loc[quartil:terceiro_quartil], None),
+        'recorte_serie': (lambda: serie_precos.intervalo(quartil, terceiro_quartil).para_dataframe(), None),
+        'indice_precos': (lambda: IndicePrecos.de_dataframe(df_cotacoes), None),
+        'consulta_intervalos': (consultar_intervalos, None),
+        'variacoes': (lambda: calcular_variacoes(df_cotacoes), None),
+        'lttb': (lambda: reduzir_serie(df_cotacoes['Preço']), None),
+        'consulta_datas': (lambda: precos_em(*indice_precos.vetores(), consultas), None),
+    }
+
+
+def etapas_previsao(df_cotacoes, inicio, prophet=False):
+    """Etapas de preparação, ajuste e previsão dos motores e de avaliação."""
+    df_treino = preparar_treino(df_cotacoes, inicio)
+    etapas = {'preparar_treino': (lambda: preparar_treino(df_cotacoes, inicio), None)}
+
+    for motor in MOTORES:
+        if motor == 'prophet' and not (prophet and len(df_treino) <= LIMITE_PROPHET):
+            continue
+        etapas[f'motor_{motor}'] = (lambda motor=motor: prever_com_motor(motor, df_treino), None)
+
+    if prophet and len(df_treino) <= LIMITE_PROPHET:
+        anterior = ajustar_modelo(df_treino.iloc[:-DIAS_NOVOS])
+        etapas['reajuste_completo'] = (lambda: ajustar_modelo(df_treino), None)
+        etapas['reajuste_incremental'] = (lambda: ajustar_incremental(df_treino, anterior), None)
+
+    tabela = prever_com_motor('suavizacao', df_treino)
+    etapas['avaliacao'] = (lambda: avaliar(tabela, df_treino), None)
+    etapas['detalhamento'] = (lambda: detalhar(tabela, df_treino), None)
+    return etapas
+
+
+def conjuntos(linhas=LINHAS_SINTETICAS):
+    """Séries medidas: o ``ipea.csv`` e uma sintética para cada tamanho, com o início do treino."""
+    series = {'ipea': (dados._ler_ipea(), INICIO_TREINO)}
+    for n in linhas:
+        df = serie_sintetica(n)
+        series[f'sintetica_{n}'] = (df, df.index[0])
+    return series
+
+
+def executar(linhas=LINHAS_SINTETICAS, repeticoes=REPETICOES, prophet=False, ao_medir=None):
+    """Mede todas as etapas de todos os conjuntos; devolve a lista de resultados."""
+    resultados = []
+    pasta = tempfile.mkdtemp(prefix='benchmark_')
+    try:
+        for nome, (df_cotacoes, inicio) in conjuntos(linhas).items():
+            etapas = {
+                **etapas_carga(nome, df_cotacoes, pasta),
+                **etapas_historico(df_cotacoes),
+                **etapas_previsao(df_cotacoes, inicio, prophet),
+            }
+            for etapa, (funcao, preparar) in etapas.items():
+                resultado = {'conjunto': nome, 'linhas': len(df_cotacoes), 'etapa': etapa,
+                             **medir(funcao, repeticoes, preparar)}
+                resultados.append(resultado)
+                if ao_medir is not None:
+                    ao_medir(resultado)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return resultados
+
+
+def ambiente():
+    """Versões e máquina, para saber se duas execuções são comparáveis."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PASTA_PROJETO,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+    }
+
+
+def comparar(resultados, base, tolerancia=TOLERANCIA):
+    """Razão entre o tempo mediano atual e o da ``base`` em cada etapa presente nas duas."""
+    anteriores = {(r['conjunto'], r['etapa']): r for r in base}
+    comparacao = []
+    for atual in resultados:
+        anterior = anteriores.get((atual['conjunto'], atual['etapa']))
+        if anterior is None:
+            continue
+        razao = atual['tempo_mediano'] / anterior['tempo_mediano'] if anterior['tempo_mediano'] > 0 else np.inf
+        regressao = razao > 1 + tolerancia and atual['tempo_mediano'] - anterior['tempo_mediano'] > RUIDO_MINIMO
+        comparacao.append({
+            'conjunto': atual['conjunto'],
+            'etapa': atual['etapa'],
+            'anterior': anterior['tempo_mediano'],
+            'atual': atual['tempo_mediano'],
+            'razao': razao,
+            'regressao': bool(regressao),
+        })
+    return comparacao
+
+
+def _formatar(resultado):
+    return (f"  {resultado['conjunto']:>18} {resultado['etapa']:<22} {resultado['tempo_mediano'] * 1000:10.2f} ms "
+            f"(mín {resultado['tempo_minimo'] * 1000:9.2f}, cpu {resultado['cpu_mediano'] * 1000:9.2f}) "
+            f"{resultado['memoria_pico'] / 2 ** 20:9.2f} MiB")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline de carga, página histórica, previsão e avaliação")
+    parser.add_argument('--linhas', type=int, nargs='*', default=LINHAS_SINTETICAS,
+                        help="tamanhos das séries sintéticas (nenhum: só o ipea.csv)")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES, help="execuções cronometradas por etapa")
+    parser.add_argument('--prophet', action='store_true', help="inclui o ajuste do Prophet (lento)")
+    parser.add_argument('--json', default=None, help="grava os resultados neste arquivo JSON")
+    parser.add_argument('--comparar', default=None, help="JSON de uma execução anterior para comparação")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help="aumento relativo do tempo mediano considerado regressão")
+    args = parser.parse_args(argumentos)
+
+    if args.prophet:
+        # Silencia o log de cada ajuste do Prophet
+        from cmdstanpy.utils import get_logger
+        from prophet import Prophet  # noqa: F401
+        get_logger().setLevel(logging.WARNING)
+
+    print("Tempo mediano por etapa (mínimo e CPU) e pico de memória")
+    resultados = executar(args.linhas, args.repeticoes, args.prophet, ao_medir=lambda r: print(_formatar(r), flush=True))
+
+    relatorio = {
+        'gerado_em': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'ambiente': ambiente(),
+        'resultados': resultados,
+    }
+    if args.json:
+        with open(args.json, 'w') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            base = json.load(arquivo)
+        comparacao = comparar(resultados, base['resultados'], args.tolerancia)
+        print(f"\nComparação com {args.comparar} (commit {base['ambiente'].get('commit')})")
+        for linha in comparacao:
+            marca = '  <- regressão' if linha['regressao'] else ''
+            print(f"  {linha['conjunto']:>18} {linha['etapa']:<22} {linha['anterior'] * 1000:10.2f} -> "
+                  f"{linha['atual'] * 1000:10.2f} ms  x{linha['razao']:.2f}{marca}")
+        if any(linha['regressao'] for linha in comparacao):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
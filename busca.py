@@ -0,0 +1,146 @@
+"""Busca de hiperparâmetros do modelo de previsão.
+
+Os candidatos combinam início da janela de treino, ``changepoint_prior_scale``,
+modo de sazonalidade e conjunto de feriados. Todos são avaliados com o
+backtest walk-forward em rodadas: a cada rodada os candidatos ainda vivos
+rodam mais alguns cortes em paralelo e os que estão claramente piores que o
+melhor são descartados. Ao final, o ranking é gravado em CSV e a melhor
+configuração passa a ser a usada pela página de previsão.
+
+Uso:
+    python busca.py --cortes 12 --rodadas 3 --processos 8
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from backtest import avaliar_corte_no_processo, gerar_cortes, iniciar_processo
+from dados import PASTA_CACHE, carregar_cotacoes, gravar_atomico
+from modelo import PARAMETROS_MODELO, salvar_configuracao
+from previsoes import HORIZONTE_MAXIMO
+
+# Espaço de busca
+INICIOS_TREINO = ["2020-01-01", "2021-01-01", "2022-05-01", "2023-01-01"]
+CHANGEPOINT_PRIOR_SCALES = [0.01, 0.05, 0.5]
+MODOS_SAZONALIDADE = ['additive', 'multiplicative']
+FERIADOS = [None, 'US', 'UK']
+
+# Candidatos com MAPE médio acima de (1 + TOLERANCIA_PODA) x o do melhor são descartados
+TOLERANCIA_PODA = 0.25
+
+CAMINHO_RANKING = os.path.join(PASTA_CACHE, "busca", "ranking.csv")
+
+
+def gerar_candidatos():
+    """Lista de ``(inicio, parametros)`` do espaço de busca."""
+    candidatos = []
+    for inicio, escala, modo, feriados in itertools.product(
+            INICIOS_TREINO, CHANGEPOINT_PRIOR_SCALES, MODOS_SAZONALIDADE, FERIADOS):
+        parametros = dict(PARAMETROS_MODELO, changepoint_prior_scale=escala, seasonality_mode=modo)
+        if feriados:
+            parametros['feriados'] = feriados
+        candidatos.append((inicio, parametros))
+    return candidatos
+
+
+def podar(mapes, vivos, tolerancia=TOLERANCIA_PODA):
+    """Candidatos vivos cujo MAPE médio ainda está perto do melhor."""
+    medias = {i: np.mean(mapes[i]) for i in vivos}
+    melhor = min(medias.values())
+    return [i for i in vivos if medias[i] <= melhor * (1 + tolerancia)]
+
+
+def buscar(df_cotacoes, candidatos, cortes, rodadas=3, horizonte=HORIZONTE_MAXIMO, processos=None,
+           tolerancia=TOLERANCIA_PODA, ao_concluir=None):
+    """Avalia os candidatos e devolve o ranking como DataFrame.
+
+    Os cortes são divididos em ``rodadas`` blocos; depois de cada bloco os
+    candidatos claramente piores são podados. ``ao_concluir`` é chamado com
+    ``(indice_candidato, resultado)`` a cada corte concluído.
+    """
+    blocos = [bloco for bloco in np.array_split(np.arange(len(cortes)), rodadas) if len(bloco)]
+    ds = df_cotacoes.index.to_numpy(dtype='datetime64[ns]')
+    y = df_cotacoes['Preço'].to_numpy(dtype='float64')
+
+    resultados = {i: [] for i in range(len(candidatos))}
+    vivos = list(resultados)
+    podados = {}
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=iniciar_processo, initargs=(ds, y)) as pool:
+        for rodada, bloco in enumerate(blocos, start=1):
+            tarefas = {}
+            for i in vivos:
+                inicio, parametros = candidatos[i]
+                for posicao in bloco:
+                    tarefa = pool.submit(avaliar_corte_no_processo, cortes[posicao], inicio, parametros, horizonte)
+                    tarefas[tarefa] = i
+            for tarefa in as_completed(tarefas):
+                i = tarefas[tarefa]
+                resultados[i].append(tarefa.result())
+                if ao_concluir is not None:
+                    ao_concluir(i, resultados[i][-1])
+
+            if rodada < len(blocos):
+                mapes = {i: [r['mape'] for r in resultados[i]] for i in vivos}
+                restantes = podar(mapes, vivos, tolerancia)
+                podados.update({i: rodada for i in vivos if i not in restantes})
+                vivos = restantes
+
+    linhas = []
+    for i, (inicio, parametros) in enumerate(candidatos):
+        metricas = pd.DataFrame(resultados[i])
+        linhas.append({
+            'inicio': inicio,
+            'changepoint_prior_scale': parametros.get('changepoint_prior_scale'),
+            'seasonality_mode': parametros.get('seasonality_mode'),
+            'feriados': parametros.get('feriados'),
+            'cortes': len(metricas),
+            'mape': metricas['mape'].mean(),
+            'rmse': metricas['rmse'].mean(),
+            'mae': metricas['mae'].mean(),
+            'cobertura': metricas['cobertura'].mean(),
+            'podado_na_rodada': podados.get(i),
+            'candidato': i,
+        })
+    ranking = pd.DataFrame(linhas)
+    ranking['completo'] = ranking['podado_na_rodada'].isna()
+    return ranking.sort_values(['completo', 'mape'], ascending=[False, True]).reset_index(drop=True)
+
+
+def salvar_ranking(ranking, caminho=CAMINHO_RANKING):
+    gravar_atomico(caminho, lambda temporario: ranking.drop(columns=['candidato']).to_csv(temporario, index=False))
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros do modelo de previsão do Brent")
+    parser.add_argument('--cortes', type=int, default=12, help="quantidade de datas de corte do backtest")
+    parser.add_argument('--rodadas', type=int, default=3, help="rodadas de poda")
+    parser.add_argument('--processos', type=int, default=None, help="processos no pool (padrão: todos os núcleos)")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PODA, help="tolerância da poda")
+    parser.add_argument('--offline', action='store_true', help="não busca dados novos no yfinance")
+    args = parser.parse_args(argumentos)
+
+    df_cotacoes = carregar_cotacoes(atualizar=not args.offline)
+    candidatos = gerar_candidatos()
+    # Os cortes precisam ser válidos para a janela de treino mais curta
+    cortes = gerar_cortes(df_cotacoes.index, args.cortes, max(INICIOS_TREINO))
+
+    print(f"{len(candidatos)} candidatos x {len(cortes)} cortes", flush=True)
+    ranking = buscar(df_cotacoes, candidatos, cortes, args.rodadas, processos=args.processos,
+                     tolerancia=args.tolerancia)
+    salvar_ranking(ranking)
+
+    melhor = ranking.iloc[0]
+    inicio, parametros = candidatos[int(melhor['candidato'])]
+    salvar_configuracao(inicio, parametros)
+
+    print(ranking.drop(columns=['candidato']).head(10).round(4).to_string(index=False))
+    print(f"Melhor configuração: início {inicio}, parâmetros {parametros}")
+
+
+if __name__ == '__main__':
+    main()
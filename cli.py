@@ -0,0 +1,119 @@
+"""Atualização das previsões em lote, fora da interface.
+
+``atualizar`` busca os dias novos de cotação de cada série, ajusta (ou
+reaproveita) os modelos em paralelo, calcula as tabelas de previsões e as
+métricas e publica o resultado em ``cache/publicado``. A página de previsão só lê o que foi publicado.
+``agendar`` repete a atualização em intervalos fixos. Um arquivo de trava
+impede que dois processos façam o ajuste ao mesmo tempo.
+
+Uso:
+    python cli.py atualizar [--offline] [--series brent wti]
+    python cli.py agendar --intervalo 3600
+"""
+import argparse
+import fcntl
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from dados import PASTA_CACHE, SERIES, carregar_varias
+from modelo import carregar_configuracao
+from previsao_series import prever_series
+from previsoes import publicar, publicar_todas
+
+CAMINHO_TRAVA = os.path.join(PASTA_CACHE, "atualizacao.lock")
+
+
+class AtualizacaoEmAndamento(Exception):
+    """Outro processo já está atualizando as previsões."""
+
+
+@contextmanager
+def travar(caminho=CAMINHO_TRAVA):
+    """Trava exclusiva entre processos; falha na hora se já estiver em uso."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # Abre sem truncar: quem não conseguir a trava não apaga o PID de quem a tem
+    with open(caminho, 'a+') as arquivo:
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise AtualizacaoEmAndamento(caminho) from None
+        try:
+            arquivo.truncate(0)
+            arquivo.write(str(os.getpid()))
+            arquivo.flush()
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+def atualizar(series=None, offline=False, processos=None):
+    """Atualiza dados, modelos, previsões e métricas e publica o resultado.
+
+    Retorna os manifestos publicados, por série.
+    """
+    with travar():
+        cotacoes = carregar_varias(series, atualizar=not offline)
+        inicio, parametros = carregar_configuracao()
+        previsoes, resultados = prever_series(cotacoes, inicio, parametros, processos)
+
+        manifestos = {}
+        for serie, resultado in resultados.items():
+            manifesto = publicar(resultado['tabela'], resultado['metricas'], resultado['chave'], inicio, parametros,
+                                 resultado['ultima_data'], serie)
+            manifesto['modo_ajuste'] = resultado['modo_ajuste']
+            manifestos[serie] = manifesto
+        publicar_todas(previsoes)
+        return manifestos
+
+
+def _executar(series, offline, processos):
+    inicio = time.perf_counter()
+    try:
+        manifestos = atualizar(series, offline, processos)
+    except AtualizacaoEmAndamento:
+        print("Atualização já em andamento em outro processo; nada a fazer.", flush=True)
+        return True
+    except Exception as erro:
+        print(f"Falha na atualização: {erro!r}", file=sys.stderr, flush=True)
+        return False
+    for serie, manifesto in manifestos.items():
+        print(f"{serie}: previsões publicadas até {manifesto['ultima_data']} (ajuste {manifesto['modo_ajuste']}, "
+              f"MAPE {manifesto['metricas']['mape']:.2f}%)", flush=True)
+    sem_dados = sorted(set(series or SERIES) - set(manifestos))
+    if sem_dados:
+        print(f"Séries sem dados: {', '.join(sem_dados)}", flush=True)
+    print(f"Atualização concluída em {time.perf_counter() - inicio:.1f}s", flush=True)
+    return True
+
+
+def agendar(intervalo, series=None, offline=False, processos=None):
+    """Executa ``atualizar`` a cada ``intervalo`` segundos, indefinidamente."""
+    while True:
+        inicio = time.monotonic()
+        _executar(series, offline, processos)
+        time.sleep(max(0.0, intervalo - (time.monotonic() - inicio)))
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Atualização em lote das previsões do preço do Brent")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    parser_atualizar = subparsers.add_parser('atualizar', help="atualiza e publica as previsões uma vez")
+    parser_agendar = subparsers.add_parser('agendar', help="atualiza as previsões periodicamente")
+    parser_agendar.add_argument('--intervalo', type=float, default=3600, help="segundos entre atualizações")
+    for subparser in (parser_atualizar, parser_agendar):
+        subparser.add_argument('--offline', action='store_true', help="não busca dados novos no yfinance")
+        subparser.add_argument('--series', nargs='+', choices=list(SERIES), default=None,
+                               help="séries a atualizar (padrão: todas)")
+        subparser.add_argument('--processos', type=int, default=None, help="processos no pool (padrão: todos os núcleos)")
+
+    args = parser.parse_args(argumentos)
+    if args.comando == 'atualizar':
+        return 0 if _executar(args.series, args.offline, args.processos) else 1
+    agendar(args.intervalo, args.series, args.offline, args.processos)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
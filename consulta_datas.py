@@ -0,0 +1,40 @@
+"""Consulta do preço em datas específicas.
+
+Busca binária sobre o array ordenado de datas. Em fins de semana e feriados,
+quando não há pregão na data pedida, devolve o pregão anterior mais próximo.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _posicoes(datas, consultas):
+    # Posição do último pregão em ou antes de cada data consultada (-1 se não houver)
+    return np.searchsorted(datas, consultas, side='right') - 1
+
+
+def preco_em(datas, precos, data):
+    """Data do pregão usado e preço para ``data``.
+
+    Retorna ``(None, nan)`` se ``data`` for anterior ao primeiro pregão.
+    """
+    consulta = np.datetime64(pd.Timestamp(data), 'ns')
+    posicao = int(_posicoes(datas, consulta))
+    if posicao < 0:
+        return None, np.nan
+    return pd.Timestamp(datas[posicao]), float(precos[posicao])
+
+
+def precos_em(datas, precos, consultas):
+    """Preços de várias datas de uma vez, em um DataFrame.
+
+    Colunas: ``Data`` (pedida), ``Pregão`` (data usada) e ``Preço``.
+    """
+    consultas = pd.DatetimeIndex(pd.to_datetime(consultas))
+    posicoes = _posicoes(datas, consultas.to_numpy(dtype='datetime64[ns]'))
+    validas = posicoes >= 0
+    indices = np.where(validas, posicoes, 0)
+
+    pregoes = np.asarray(datas)[indices].astype('datetime64[ns]')
+    pregoes[~validas] = np.datetime64('NaT')
+    valores = np.where(validas, np.asarray(precos)[indices], np.nan)
+    return pd.DataFrame({'Data': consultas, 'Pregão': pregoes, 'Preço': valores})
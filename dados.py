@@ -0,0 +1,153 @@
+"""Base local de cotações do petróleo (Brent, WTI e outras referências).
+
+Cada série tem sua base em Parquet. A do Brent é semeada a partir do
+``ipea.csv`` distribuído com o projeto; as demais são baixadas inteiras na
+primeira carga. A cada carga só os dias que faltam no final da série são
+buscados no yfinance, até o último pregão já encerrado; se a fonte estiver
+indisponível, a aplicação segue funcionando com os dados locais.
+"""
+import os
+import threading
+from contextlib import suppress
+
+import pandas as pd
+
+# Ticker e data inicial usados na aplicação
+INDICE = "BZ=F"
+INICIO = "2000-01-01"
+
+# Arquivos da base local
+CAMINHO_IPEA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ipea.csv")
+PASTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+CAMINHO_BASE = os.path.join(PASTA_CACHE, "cotacoes.parquet")
+
+# Séries disponíveis: nome exibido, ticker no yfinance, CSV usado como semente e arquivo da base
+SERIES = {
+    'brent': {'nome': 'Petróleo Brent', 'indice': INDICE, 'semente': CAMINHO_IPEA, 'base': CAMINHO_BASE},
+    'wti': {'nome': 'Petróleo WTI', 'indice': "CL=F", 'semente': None,
+            'base': os.path.join(PASTA_CACHE, "cotacoes_wti.parquet")},
+}
+SERIE_PADRAO = 'brent'
+
+
+def _ler_ipea(caminho=CAMINHO_IPEA):
+    """Lê o CSV do IPEA no mesmo formato de ``df_cotacoes``."""
+    df = pd.read_csv(caminho)
+    df.columns = ['Date', 'Preço']
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df.set_index('Date').sort_index()
+
+
+def _base_vazia():
+    return pd.DataFrame({'Preço': pd.Series(dtype='float64')}, index=pd.DatetimeIndex([], name='Date'))
+
+
+def _ler_base(caminho=CAMINHO_BASE, semente=CAMINHO_IPEA):
+    if os.path.exists(caminho):
+        return pd.read_parquet(caminho)
+    if semente:
+        return _ler_ipea(semente)
+    return _base_vazia()
+
+
+def gravar_atomico(caminho, gravar):
+    """Grava ``caminho`` chamando ``gravar(temporario)`` e renomeando no fim.
+
+    O temporário fica na mesma pasta, com nome próprio do processo e da
+    thread: gravações concorrentes (job em lote e sessões da página) não se
+    misturam, e quem lê encontra o arquivo anterior ou o novo inteiro.
+    """
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    temporario = f'{caminho}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        gravar(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        # Só sobra temporário se a gravação falhou
+        with suppress(FileNotFoundError):
+            os.remove(temporario)
+
+
+def gravar_texto(caminho, texto):
+    """``gravar_atomico`` de um arquivo de texto."""
+    def gravar(temporario):
+        with open(temporario, 'w') as arquivo:
+            arquivo.write(texto)
+    gravar_atomico(caminho, gravar)
+
+
+def _salvar_base(df, caminho=CAMINHO_BASE):
+    gravar_atomico(caminho, df.to_parquet)
+
+
+def _ultimo_pregao_encerrado(hoje=None):
+    # O pregão de hoje pode estar em andamento: o "fechamento" dele seria o preço do momento
+    hoje = pd.Timestamp(hoje or pd.Timestamp.today()).normalize()
+    return hoje - pd.offsets.BDay()
+
+
+def _baixar_cotacoes(indice, inicio, fim):
+    """Busca no yfinance os fechamentos de ``inicio`` até antes de ``fim``."""
+    import yfinance as yf
+
+    dados_acao = yf.download(indice, start=inicio, end=fim, progress=False)
+    if dados_acao is None or dados_acao.empty:
+        return _base_vazia()
+
+    fechamento = dados_acao['Close']
+    # Versões recentes do yfinance devolvem colunas com MultiIndex (campo, ticker)
+    if isinstance(fechamento, pd.DataFrame):
+        fechamento = fechamento[indice]
+
+    df = pd.DataFrame({'Preço': fechamento.astype(float)}).dropna()
+    df.index = pd.to_datetime(df.index).tz_localize(None)
+    df.index.name = 'Date'
+    return df
+
+
+def atualizar_base(indice=INDICE, caminho=CAMINHO_BASE, hoje=None, semente=CAMINHO_IPEA):
+    """Completa a base local com os dias que faltam no final da série.
+
+    Retorna a base atualizada. Falhas na fonte externa não são propagadas:
+    nesse caso a base local é devolvida como está.
+    """
+    df = _ler_base(caminho, semente)
+    fim = _ultimo_pregao_encerrado(hoje)
+    # O último dia gravado é buscado de novo e o valor da fonte prevalece, corrigindo um
+    # fechamento provisório; base sem semente e ainda vazia: baixa a série inteira
+    inicio = df.index.max() if len(df) else pd.Timestamp(INICIO)
+
+    novos = _base_vazia()
+    if not len(df) or inicio < fim:
+        try:
+            novos = _baixar_cotacoes(indice, inicio.strftime('%Y-%m-%d'),
+                                     (fim + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+        except Exception:
+            novos = _base_vazia()
+
+    novos = novos[(novos.index >= inicio) & (novos.index <= fim)]
+    alterada = len(novos) > 0 and not novos.equals(df.loc[novos.index[0]:])
+    if alterada:
+        df = pd.concat([df[df.index < novos.index[0]], novos]) if len(df) else novos
+
+    if alterada or (len(df) and not os.path.exists(caminho)):
+        _salvar_base(df, caminho)
+    return df
+
+
+def carregar_cotacoes(serie=SERIE_PADRAO, inicio=INICIO, atualizar=True):
+    """Carrega ``df_cotacoes`` de ``serie``: coluna ``Preço`` indexada por ``Date``.
+
+    Com ``atualizar=False`` nenhuma chamada de rede é feita.
+    """
+    configuracao = SERIES[serie]
+    if atualizar:
+        df = atualizar_base(configuracao['indice'], configuracao['base'], semente=configuracao['semente'])
+    else:
+        df = _ler_base(configuracao['base'], configuracao['semente'])
+    return df.loc[inicio:]
+
+
+def carregar_varias(series=None, inicio=INICIO, atualizar=True):
+    """``df_cotacoes`` de cada série pedida (todas, por padrão), por nome."""
+    return {serie: carregar_cotacoes(serie, inicio, atualizar) for serie in (series or list(SERIES))}
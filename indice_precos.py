@@ -0,0 +1,152 @@
+"""Índice de consultas por intervalo de datas sobre a série de preços.
+
+Guarda somas acumuladas (para médias) e sparse tables (para mínimo e máximo),
+de forma que média, mínimo e máximo de qualquer intervalo de datas saem em
+tempo constante, sem fatiar DataFrames. Também mantém resumos por ano e por
+mês. Dias novos no final da série são incorporados sem reconstruir o índice.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class IndicePrecos:
+    """Consultas O(1) de média, mínimo e máximo por intervalo de datas.
+
+    Arrays, tabelas e resumos ficam numa única tupla de estado, trocada de uma
+    vez por ``anexar``: consultas concorrentes veem o estado anterior ou o
+    novo, nunca uma mistura dos dois.
+    """
+
+    def __init__(self, datas, precos):
+        self._lock = threading.Lock()
+        datas = np.asarray(datas, dtype='datetime64[ns]')
+        precos = np.asarray(precos, dtype='float64')
+        somas = np.concatenate([[0.0], np.cumsum(precos)])
+        minimos, maximos = self._estender_tabelas(precos, [precos], [precos], 0)
+        self._publicar(datas, precos, somas, minimos, maximos)
+
+    @classmethod
+    def de_dataframe(cls, df_cotacoes):
+        return cls(df_cotacoes.index.to_numpy(dtype='datetime64[ns]'), df_cotacoes['Preço'].to_numpy())
+
+    @property
+    def datas(self):
+        return self._estado[0]
+
+    @property
+    def precos(self):
+        return self._estado[1]
+
+    @property
+    def resumo_anual(self):
+        return self._estado[5]
+
+    @property
+    def resumo_mensal(self):
+        return self._estado[6]
+
+    def vetores(self):
+        """Datas e preços de um mesmo estado do índice."""
+        datas, precos = self._estado[:2]
+        return datas, precos
+
+    def __len__(self):
+        return len(self.precos)
+
+    @staticmethod
+    def _estender_tabelas(precos, minimos, maximos, n_anterior):
+        # Nível k guarda o mínimo/máximo das janelas de tamanho 2**k que começam em cada posição.
+        # Só as janelas que terminam depois de n_anterior precisam ser calculadas.
+        # Devolve listas novas: as tabelas do estado publicado não são alteradas.
+        minimos, maximos = [precos] + minimos[1:], [precos] + maximos[1:]
+        n = len(precos)
+        k = 1
+        while 2 ** k <= n:
+            metade = 2 ** (k - 1)
+            tamanho = n - 2 ** k + 1
+            inicio = max(n_anterior - 2 ** k + 1, 0) if k < len(minimos) else 0
+            novos_min = np.minimum(minimos[k - 1][inicio:tamanho], minimos[k - 1][inicio + metade:tamanho + metade])
+            novos_max = np.maximum(maximos[k - 1][inicio:tamanho], maximos[k - 1][inicio + metade:tamanho + metade])
+            if k < len(minimos):
+                minimos[k] = np.concatenate([minimos[k][:inicio], novos_min])
+                maximos[k] = np.concatenate([maximos[k][:inicio], novos_max])
+            else:
+                minimos.append(novos_min)
+                maximos.append(novos_max)
+            k += 1
+        return minimos, maximos
+
+    def _publicar(self, datas, precos, somas, minimos, maximos):
+        estado = (datas, precos, somas, minimos, maximos)
+        self._estado = estado + (self._resumo_por_periodo(estado, 'Y'), self._resumo_por_periodo(estado, 'M'))
+
+    @classmethod
+    def _resumo_por_periodo(cls, estado, unidade):
+        periodos = estado[0].astype(f'datetime64[{unidade}]')
+        rotulos, inicios = np.unique(periodos, return_index=True)
+        fins = np.append(inicios[1:], len(periodos))
+        linhas = [cls._agregar(estado, i, j) for i, j in zip(inicios, fins)]
+        if unidade == 'Y':
+            indice = pd.Index(rotulos.astype('int64') + 1970, name='ano')
+        else:
+            indice = pd.PeriodIndex(rotulos.astype('datetime64[ns]'), freq='M', name='mes')
+        return pd.DataFrame(linhas, index=indice, columns=['media', 'minimo', 'maximo', 'pregoes'])
+
+    @staticmethod
+    def _posicoes(datas, inicio, fim):
+        i = np.searchsorted(datas, np.datetime64(pd.Timestamp(inicio), 'ns'), side='left')
+        j = np.searchsorted(datas, np.datetime64(pd.Timestamp(fim), 'ns'), side='right')
+        return i, max(i, j)
+
+    @staticmethod
+    def _agregar(estado, i, j):
+        _, _, somas, minimos, maximos = estado[:5]
+        n = j - i
+        if n <= 0:
+            return np.nan, np.nan, np.nan, 0
+        k = int(n).bit_length() - 1
+        fim = j - 2 ** k
+        media = (somas[j] - somas[i]) / n
+        minimo = min(minimos[k][i], minimos[k][fim])
+        maximo = max(maximos[k][i], maximos[k][fim])
+        return float(media), float(minimo), float(maximo), int(n)
+
+    def intervalo(self, inicio, fim):
+        """Média, mínimo, máximo e pregões entre ``inicio`` e ``fim`` (inclusive)."""
+        estado = self._estado
+        media, minimo, maximo, n = self._agregar(estado, *self._posicoes(estado[0], inicio, fim))
+        return {'media': media, 'minimo': minimo, 'maximo': maximo, 'pregoes': n}
+
+    def ano(self, ano):
+        """Resumo de um ano (média, mínimo, máximo e pregões)."""
+        return self.resumo_anual.loc[ano]
+
+    def anexar(self, datas, precos):
+        """Incorpora dias posteriores ao último dia do índice."""
+        datas_atuais, precos_atuais, somas, minimos, maximos = self._estado[:5]
+        datas = np.asarray(datas, dtype='datetime64[ns]')
+        precos = np.asarray(precos, dtype='float64')
+        if len(datas_atuais):
+            novos = datas > datas_atuais[-1]
+            datas, precos = datas[novos], precos[novos]
+        if not len(datas):
+            return 0
+
+        # Monta o novo estado à parte e publica tudo de uma vez
+        n_anterior = len(precos_atuais)
+        precos_novos = np.concatenate([precos_atuais, precos])
+        minimos, maximos = self._estender_tabelas(precos_novos, minimos, maximos, n_anterior)
+        self._publicar(np.concatenate([datas_atuais, datas]), precos_novos,
+                       np.concatenate([somas, somas[-1] + np.cumsum(precos)]), minimos, maximos)
+        return len(datas)
+
+    def sincronizar(self, df_cotacoes):
+        """Anexa os dias de ``df_cotacoes`` que ainda não estão no índice."""
+        with self._lock:
+            datas = self.datas
+            if len(df_cotacoes) and len(datas) and df_cotacoes.index[-1] <= datas[-1]:
+                return 0
+            novos = df_cotacoes[df_cotacoes.index > datas[-1]] if len(datas) else df_cotacoes
+            return self.anexar(novos.index.to_numpy(dtype='datetime64[ns]'), novos['Preço'].to_numpy())
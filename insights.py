@@ -0,0 +1,82 @@
+"""Seções de insights ano a ano da página de dados históricos.
+
+Os anos exibidos e os comentários de cada um vêm de ``insights_anos.json``:
+incluir um ano novo é só acrescentar uma entrada no arquivo. As séries de
+todos os anos saem de uma única passada de ``groupby`` e os gráficos ficam
+memorizados enquanto os dados não mudam.
+"""
+import json
+import os
+
+import streamlit as st
+from plotly import graph_objs as go
+
+CAMINHO_INSIGHTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "insights_anos.json")
+
+
+def carregar_insights(caminho=CAMINHO_INSIGHTS):
+    """Configuração das seções: faixa do eixo de preço e lista de anos."""
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def criar_figuras(df_cotacoes, anos, faixa_preco):
+    """Gráfico de linha de cada ano, com uma única passada sobre os dados."""
+    figuras = {}
+    for ano, df_ano in df_cotacoes.groupby(df_cotacoes.index.year):
+        if ano not in anos:
+            continue
+
+        # Plota gráfico de linha
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=df_ano.index, y=df_ano['Preço'], mode='lines', name='Preço do Petróleo'))
+
+        # Configurar layout do gráfico
+        fig.update_layout(
+            title=f'Preços históricos de petróleo em {ano}',
+            title_font_size=20,
+            xaxis_title='Data',
+            yaxis_title='Preço',
+            template='plotly_white',
+            yaxis=dict(range=faixa_preco)  # Define o intervalo do eixo y
+        )
+        figuras[ano] = fig
+    return figuras
+
+
+# A última data identifica a versão dos dados; o DataFrame em si não é hasheado
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _figuras_memorizadas(_df_cotacoes, ultima_data, anos, faixa_preco):
+    return criar_figuras(_df_cotacoes, anos, list(faixa_preco))
+
+
+def exibir_insights(df_cotacoes, indice_precos, caminho=CAMINHO_INSIGHTS):
+    """Exibe gráfico, preço médio e comentário de cada ano configurado."""
+    configuracao = carregar_insights(caminho)
+    secoes = configuracao['anos']
+    anos = tuple(secao['ano'] for secao in secoes)
+    figuras = _figuras_memorizadas(df_cotacoes, df_cotacoes.index.max(), anos, tuple(configuracao['faixa_preco']))
+
+    for secao in secoes:
+        ano = secao['ano']
+        if ano not in figuras:
+            continue
+
+        if secao.get('separador'):
+            st.markdown("---")
+            st.write("")
+            st.write("")
+
+        st.write(f"###### {ano}")
+
+        # Exibir o gráfico Plotly
+        st.plotly_chart(figuras[ano])
+
+        # Exibir a média de preço do ano como big number
+        st.metric(label=f"Preço Médio em {ano}", value=round(indice_precos.ano(ano)['media'], 2))
+
+        st.write(f"""
+        <h6 style='font-weight: 300; text-align: justify'>
+        {secao['comentario']}
+        </h6>
+        """, unsafe_allow_html=True)
@@ -0,0 +1,253 @@
+"""Instrumentação das etapas de cada execução (rerun) da aplicação.
+
+Desligada por padrão. Com a variável de ambiente ``PETROLEO_INSTRUMENTACAO``
+definida, cada ``with etapa('nome'):`` registra tempo de relógio, tempo de CPU
+da thread e pico de memória alocada pelo Python (``tracemalloc``) na etapa.
+Com ``PETROLEO_INSTRUMENTACAO=tempo`` a memória não é medida e o
+``tracemalloc`` não é ligado.
+
+Ao fim de cada execução o registro é emitido como uma linha JSON no logger
+deste módulo, somado às métricas agregadas (texto no formato do Prometheus,
+servido em ``/metrics`` se ``PETROLEO_METRICAS_PORTA`` estiver definida) e
+mostrado no painel de depuração da barra lateral.
+
+O ``tracemalloc`` é global ao processo: com várias sessões renderizando ao
+mesmo tempo, o pico de uma etapa inclui as alocações das outras.
+
+Desligada, ``etapa`` devolve sempre o mesmo gerenciador de contexto vazio.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_MODO = os.environ.get('PETROLEO_INSTRUMENTACAO', '').strip().lower()
+ATIVA = _MODO not in ('', '0', 'false', 'nao', 'não')
+MEDIR_MEMORIA = ATIVA and _MODO != 'tempo'
+PORTA_METRICAS = os.environ.get('PETROLEO_METRICAS_PORTA')
+
+# Execuções guardadas para o painel
+LIMITE_EXECUCOES = 50
+
+logger = logging.getLogger(__name__)
+
+_NULO = nullcontext()
+_local = threading.local()
+_lock = threading.Lock()
+_execucoes = deque(maxlen=LIMITE_EXECUCOES)
+_etapas = {}
+_paginas = {}
+_contador = 0
+_servidor = None
+_servidor_tentado = False
+
+
+def _configurar_log():
+    # O Streamlit só mostra WARNING do logger raiz; os registros vão direto para o stderr
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+def iniciar_execucao(pagina):
+    """Começa o registro de uma execução do script para ``pagina``."""
+    global _contador
+    if not ATIVA:
+        return
+    if MEDIR_MEMORIA and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    with _lock:
+        _contador += 1
+        numero = _contador
+    _local.execucao = {
+        'execucao': numero,
+        'pagina': pagina,
+        'inicio': datetime.now().isoformat(timespec='milliseconds'),
+        'etapas': [],
+        '_relogio': time.perf_counter(),
+        '_cpu': time.thread_time(),
+    }
+    _local.pilha = []
+
+
+def etapa(nome):
+    """Gerenciador de contexto que mede o bloco como a etapa ``nome``."""
+    if not ATIVA or getattr(_local, 'execucao', None) is None:
+        return _NULO
+    return _medir(nome)
+
+
+@contextmanager
+def _medir(nome):
+    pilha = _local.pilha
+    registro = {'etapa': nome, 'nivel': len(pilha), 'pico_filhas': 0}
+    if MEDIR_MEMORIA:
+        atual, pico = tracemalloc.get_traced_memory()
+        # O pico é zerado a cada etapa; a etapa mãe guarda o que já tinha alcançado
+        if pilha:
+            pilha[-1]['pico_filhas'] = max(pilha[-1]['pico_filhas'], pico)
+        tracemalloc.reset_peak()
+        registro['_memoria'] = atual
+    pilha.append(registro)
+    _local.execucao['etapas'].append(registro)
+
+    inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        registro['tempo'] = time.perf_counter() - inicio
+        registro['cpu'] = time.thread_time() - inicio_cpu
+        pilha.pop()
+        if MEDIR_MEMORIA:
+            _, pico = tracemalloc.get_traced_memory()
+            pico = max(pico, registro['pico_filhas'])
+            registro['memoria_pico'] = max(pico - registro.pop('_memoria'), 0)
+            if pilha:
+                pilha[-1]['pico_filhas'] = max(pilha[-1]['pico_filhas'], pico)
+        del registro['pico_filhas']
+
+
+def finalizar_execucao():
+    """Fecha a execução atual, registra no log e nas métricas e a devolve."""
+    execucao = getattr(_local, 'execucao', None) if ATIVA else None
+    if execucao is None:
+        return None
+    _local.execucao = None
+    execucao['tempo'] = time.perf_counter() - execucao.pop('_relogio')
+    execucao['cpu'] = time.thread_time() - execucao.pop('_cpu')
+    # Etapas interrompidas (parada ou novo rerun do Streamlit) ficam sem tempo
+    execucao['etapas'] = [registro for registro in execucao['etapas'] if 'tempo' in registro]
+
+    with _lock:
+        pagina = _paginas.setdefault(execucao['pagina'], {'contagem': 0, 'tempo': 0.0, 'cpu': 0.0})
+        pagina['contagem'] += 1
+        pagina['tempo'] += execucao['tempo']
+        pagina['cpu'] += execucao['cpu']
+        for registro in execucao['etapas']:
+            agregado = _etapas.setdefault(registro['etapa'], {'contagem': 0, 'tempo': 0.0, 'cpu': 0.0, 'memoria_pico': 0})
+            agregado['contagem'] += 1
+            agregado['tempo'] += registro['tempo']
+            agregado['cpu'] += registro['cpu']
+            agregado['memoria_pico'] = max(agregado['memoria_pico'], registro.get('memoria_pico', 0))
+        _execucoes.append(execucao)
+
+    _configurar_log()
+    logger.info(json.dumps(execucao, ensure_ascii=False))
+    return execucao
+
+
+def execucoes():
+    """Últimas execuções registradas, da mais antiga para a mais recente."""
+    with _lock:
+        return list(_execucoes)
+
+
+def _rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def metricas_prometheus():
+    """Métricas agregadas no formato de texto do Prometheus."""
+    linhas = []
+
+    def metrica(nome, tipo, descricao, valores):
+        linhas.append(f'# HELP {nome} {descricao}')
+        linhas.append(f'# TYPE {nome} {tipo}')
+        for rotulo, chave, valor in valores:
+            linhas.append(f'{nome}{{{rotulo}="{_rotulo(chave)}"}} {valor}')
+
+    with _lock:
+        paginas = {pagina: dict(valores) for pagina, valores in _paginas.items()}
+        etapas = {nome: dict(valores) for nome, valores in _etapas.items()}
+
+    metrica('petroleo_execucoes_total', 'counter', 'Execuções do script por página.',
+            [('pagina', pagina, v['contagem']) for pagina, v in paginas.items()])
+    metrica('petroleo_execucao_segundos_total', 'counter', 'Tempo de relógio acumulado das execuções por página.',
+            [('pagina', pagina, v['tempo']) for pagina, v in paginas.items()])
+    metrica('petroleo_execucao_cpu_segundos_total', 'counter', 'Tempo de CPU acumulado das execuções por página.',
+            [('pagina', pagina, v['cpu']) for pagina, v in paginas.items()])
+    metrica('petroleo_etapa_execucoes_total', 'counter', 'Execuções de cada etapa.',
+            [('etapa', nome, v['contagem']) for nome, v in etapas.items()])
+    metrica('petroleo_etapa_segundos_total', 'counter', 'Tempo de relógio acumulado por etapa.',
+            [('etapa', nome, v['tempo']) for nome, v in etapas.items()])
+    metrica('petroleo_etapa_cpu_segundos_total', 'counter', 'Tempo de CPU acumulado por etapa.',
+            [('etapa', nome, v['cpu']) for nome, v in etapas.items()])
+    if MEDIR_MEMORIA:
+        metrica('petroleo_etapa_memoria_pico_bytes', 'gauge', 'Maior pico de memória alocada numa etapa.',
+                [('etapa', nome, v['memoria_pico']) for nome, v in etapas.items()])
+    return '\n'.join(linhas) + '\n'
+
+
+class _Metricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        corpo = metricas_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *argumentos):
+        pass
+
+
+def iniciar_servidor_metricas(porta=PORTA_METRICAS):
+    """Serve ``/metrics`` numa thread à parte, uma única vez por processo.
+
+    Se a porta não puder ser usada, registra um aviso e segue sem servidor;
+    a tentativa não se repete nas execuções seguintes.
+    """
+    global _servidor, _servidor_tentado
+    if not ATIVA or not porta:
+        return None
+    with _lock:
+        if not _servidor_tentado:
+            _servidor_tentado = True
+            try:
+                _servidor = ThreadingHTTPServer(('', int(porta)), _Metricas)
+            except (OSError, ValueError) as erro:
+                _configurar_log()
+                logger.warning("Métricas não serão servidas na porta %s: %s", porta, erro)
+            else:
+                threading.Thread(target=_servidor.serve_forever, daemon=True).start()
+    return _servidor
+
+
+def exibir_painel(execucao):
+    """Painel de depuração na barra lateral com ``execucao`` e as métricas agregadas."""
+    if execucao is None:
+        return
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("Depuração: desempenho"):
+        st.write(f"Execução {execucao['execucao']}: {execucao['tempo'] * 1000:.0f} ms "
+                 f"(CPU {execucao['cpu'] * 1000:.0f} ms)")
+        tabela = pd.DataFrame({
+            'Tempo (ms)': [registro['tempo'] * 1000 for registro in execucao['etapas']],
+            'CPU (ms)': [registro['cpu'] * 1000 for registro in execucao['etapas']],
+            'Memória (MiB)': [registro.get('memoria_pico', float('nan')) / 2 ** 20 for registro in execucao['etapas']],
+        }, index=pd.Index(['· ' * registro['nivel'] + registro['etapa'] for registro in execucao['etapas']], name='Etapa'))
+        st.dataframe(tabela.style.format(precision=1))
+
+        anteriores = execucoes()[::-1]
+        st.caption("Últimas execuções")
+        st.dataframe(pd.DataFrame({
+            'Página': [e['pagina'] for e in anteriores],
+            'Tempo (ms)': [round(e['tempo'] * 1000) for e in anteriores],
+        }, index=pd.Index([e['execucao'] for e in anteriores], name='Execução')))
+
+        st.caption("Métricas agregadas (Prometheus)")
+        st.code(metricas_prometheus(), language='text')
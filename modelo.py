@@ -0,0 +1,231 @@
+"""Ajuste do modelo Prophet com cache em disco.
+
+Os modelos ajustados são identificados por um hash dos dados de treino e dos
+parâmetros do modelo e serializados em JSON, de forma que sobrevivem a
+reinícios do processo. Mudar só o horizonte da previsão reaproveita o ajuste.
+Quando só alguns dias novos entram no treino e o modelo anterior ainda os
+explica bem, os parâmetros dele são reaproveitados sem nova otimização; o
+ajuste completo só roda quando a conferência de deriva falha.
+"""
+import copy
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from avaliacao import calcular_metricas
+from dados import PASTA_CACHE, SERIE_PADRAO, gravar_texto
+
+# Configuração padrão do modelo usada na página de previsão
+INICIO_TREINO = "2022-05-01"
+PARAMETROS_MODELO = {'interval_width': 0.95, 'daily_seasonality': False}
+
+# Melhor configuração encontrada pela busca (busca.py), quando existir
+CAMINHO_CONFIGURACAO = os.path.join(PASTA_CACHE, "config_modelo.json")
+
+# Cache de modelos ajustados
+PASTA_MODELOS = os.path.join(PASTA_CACHE, "modelos")
+LIMITE_MODELOS = 20
+
+# Ajuste incremental: no máximo tantas linhas acrescentadas desde o último ajuste
+# completo, e o modelo anterior precisa ter MAPE e cobertura aceitáveis nas novas
+LIMITE_LINHAS_INCREMENTAIS = 10
+LIMITE_MAPE_INCREMENTAL = 10.0
+COBERTURA_MINIMA_INCREMENTAL = 50.0
+# Amostras do intervalo de previsão na conferência de deriva (o padrão do Prophet é 1000)
+AMOSTRAS_DERIVA = 200
+
+
+def carregar_configuracao(caminho=CAMINHO_CONFIGURACAO):
+    """Início do treino e parâmetros do modelo usados pela página.
+
+    Usa a configuração gravada pela busca de hiperparâmetros e, na falta
+    dela, os valores padrão.
+    """
+    try:
+        with open(caminho) as arquivo:
+            configuracao = json.load(arquivo)
+        return configuracao['inicio'], configuracao['parametros']
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return INICIO_TREINO, dict(PARAMETROS_MODELO)
+
+
+def salvar_configuracao(inicio, parametros, caminho=CAMINHO_CONFIGURACAO):
+    gravar_texto(caminho, json.dumps({'inicio': inicio, 'parametros': parametros}, indent=2))
+
+
+def preparar_treino(df_cotacoes, inicio=INICIO_TREINO):
+    """Monta o DataFrame ``ds``/``y`` esperado pelo Prophet."""
+    df_treino = df_cotacoes[df_cotacoes.index >= inicio].reset_index()
+    return df_treino.rename(columns={'Date': 'ds', 'Preço': 'y'})
+
+
+def chave_modelo(df_treino, parametros=None):
+    """Hash dos dados de treino e dos parâmetros do modelo."""
+    parametros = PARAMETROS_MODELO if parametros is None else parametros
+    h = hashlib.sha256()
+    h.update(pd.to_datetime(df_treino['ds']).to_numpy(dtype='datetime64[ns]').tobytes())
+    h.update(df_treino['y'].to_numpy(dtype='float64').tobytes())
+    h.update(json.dumps(parametros, sort_keys=True).encode())
+    return h.hexdigest()[:32]
+
+
+def ajustar_modelo(df_treino, parametros=None):
+    """Ajusta um Prophet novo, sem passar pelo cache.
+
+    Além dos argumentos do ``Prophet``, ``parametros`` aceita ``feriados``:
+    o código do país cujos feriados entram no modelo.
+    """
+    from prophet import Prophet
+
+    parametros = dict(PARAMETROS_MODELO if parametros is None else parametros)
+    feriados = parametros.pop('feriados', None)
+    modelo = Prophet(**parametros)
+    if feriados:
+        modelo.add_country_holidays(country_name=feriados)
+    modelo.fit(df_treino[['ds', 'y']])
+    return modelo
+
+
+def limpar_cache(pasta, limite, extensao='.json'):
+    """Mantém só os ``limite`` arquivos usados mais recentemente em ``pasta``."""
+    # O acesso a um arquivo do cache atualiza o mtime. Outras sessões e processos limpam
+    # a mesma pasta ao mesmo tempo: arquivos que somem no meio do caminho são ignorados
+    arquivos = []
+    for nome in os.listdir(pasta):
+        if nome.endswith(extensao):
+            caminho = os.path.join(pasta, nome)
+            try:
+                arquivos.append((os.stat(caminho).st_mtime, caminho))
+            except FileNotFoundError:
+                pass
+    arquivos.sort(reverse=True)
+    for _, caminho in arquivos[limite:]:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def _linhas_novas(modelo_anterior, df_treino):
+    # Quantidade de linhas acrescentadas ao final do treino anterior, ou None se
+    # o treino anterior não for um prefixo exato do novo
+    historico = modelo_anterior.history
+    n = len(historico)
+    if n == 0 or n > len(df_treino):
+        return None
+    ds = pd.to_datetime(df_treino['ds']).to_numpy(dtype='datetime64[ns]')
+    if not (np.array_equal(historico['ds'].to_numpy(dtype='datetime64[ns]'), ds[:n])
+            and np.array_equal(historico['y'].to_numpy(dtype='float64'), df_treino['y'].to_numpy(dtype='float64')[:n])):
+        return None
+    return len(df_treino) - n
+
+
+def sem_deriva(modelo_anterior, df_novos, limite_mape=LIMITE_MAPE_INCREMENTAL,
+               cobertura_minima=COBERTURA_MINIMA_INCREMENTAL):
+    """Confere se o modelo anterior ainda explica bem as linhas novas."""
+    # Cópia rasa só para sortear menos amostras do intervalo; o modelo anterior não muda
+    modelo = copy.copy(modelo_anterior)
+    modelo.uncertainty_samples = min(modelo.uncertainty_samples, AMOSTRAS_DERIVA)
+    previsao = modelo.predict(df_novos[['ds']])
+    metricas = calcular_metricas(
+        df_novos['y'].to_numpy(dtype='float64'),
+        previsao['yhat'].to_numpy(),
+        previsao['yhat_lower'].to_numpy(),
+        previsao['yhat_upper'].to_numpy(),
+    )
+    return metricas['mape'] <= limite_mape and metricas['cobertura'] >= cobertura_minima
+
+
+def estender_historico(modelo_anterior, df_treino):
+    """Cópia do modelo anterior com ``df_treino`` como histórico, sem nova otimização.
+
+    Os parâmetros, as escalas e os changepoints continuam os do último ajuste
+    completo; as linhas novas ficam com ``t`` maior que 1, como datas futuras.
+    """
+    modelo = copy.copy(modelo_anterior)
+    historico = df_treino[['ds', 'y']]
+    historico = historico[historico['y'].notnull()].copy()
+    modelo.history_dates = pd.to_datetime(pd.Series(historico['ds'].unique(), name='ds')).sort_values()
+    modelo.history = modelo.setup_dataframe(historico, initialize_scales=False)
+    return modelo
+
+
+def ajustar_incremental(df_treino, modelo_anterior, parametros=None):
+    """Reaproveita o ajuste anterior quando possível.
+
+    Se o treino anterior for prefixo do novo, se desde o último ajuste
+    completo entraram no máximo ``LIMITE_LINHAS_INCREMENTAIS`` linhas e se o
+    modelo anterior explica bem as linhas novas, só o histórico é estendido
+    (``estender_historico``). Caso contrário, o modelo é ajustado do zero.
+    Retorna o modelo e o modo usado (``'incremental'`` ou ``'completo'``).
+    """
+    novas = _linhas_novas(modelo_anterior, df_treino) if modelo_anterior is not None else None
+    if novas is None or novas <= 0:
+        return ajustar_modelo(df_treino, parametros), 'completo'
+    # Linhas já acrescentadas sem otimização ficam além do fim do último ajuste completo (t > 1)
+    acumuladas = int((modelo_anterior.history['t'] > 1).sum()) + novas
+    if acumuladas > LIMITE_LINHAS_INCREMENTAIS or not sem_deriva(modelo_anterior, df_treino.iloc[-novas:]):
+        return ajustar_modelo(df_treino, parametros), 'completo'
+    return estender_historico(modelo_anterior, df_treino), 'incremental'
+
+
+def _caminho_ultimo(pasta, serie, parametros):
+    # Aponta para o último modelo ajustado da série com estes parâmetros; um
+    # arquivo por série evita que processos paralelos sobrescrevam uns aos outros
+    parametros = PARAMETROS_MODELO if parametros is None else parametros
+    chave = hashlib.sha256(json.dumps(parametros, sort_keys=True).encode()).hexdigest()[:16]
+    return os.path.join(pasta, f'ultimo_{serie}_{chave}.indice')
+
+
+def _ler_ultimo(caminho):
+    try:
+        with open(caminho) as arquivo:
+            return arquivo.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _ler_modelo(caminho):
+    from prophet.serialize import model_from_json
+
+    with open(caminho) as arquivo:
+        return model_from_json(arquivo.read())
+
+
+def obter_modelo(df_treino, parametros=None, pasta=PASTA_MODELOS, limite=LIMITE_MODELOS, incremental=True,
+                 serie=SERIE_PADRAO):
+    """Devolve o modelo ajustado para ``df_treino``, usando o cache em disco.
+
+    Sem o modelo no cache e com ``incremental=True``, o último modelo ajustado
+    para ``serie`` com os mesmos parâmetros serve de ponto de partida
+    (``ajustar_incremental``). O modo usado fica em ``modelo.modo_ajuste``.
+    """
+    from prophet.serialize import model_to_json
+
+    chave = chave_modelo(df_treino, parametros)
+    caminho = os.path.join(pasta, chave + '.json')
+    if os.path.exists(caminho):
+        modelo = _ler_modelo(caminho)
+        os.utime(caminho)
+        modelo.modo_ajuste = 'cache'
+        return modelo
+
+    modelo_anterior = None
+    caminho_ultimo = _caminho_ultimo(pasta, serie, parametros)
+    anterior = _ler_ultimo(caminho_ultimo)
+    if incremental and anterior:
+        try:
+            modelo_anterior = _ler_modelo(os.path.join(pasta, anterior + '.json'))
+        except (FileNotFoundError, ValueError):
+            modelo_anterior = None
+    modelo, modo = ajustar_incremental(df_treino, modelo_anterior, parametros)
+
+    gravar_texto(caminho, model_to_json(modelo))
+    gravar_texto(caminho_ultimo, chave)
+
+    limpar_cache(pasta, limite)
+    modelo.modo_ajuste = modo
+    return modelo
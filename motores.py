@@ -0,0 +1,189 @@
+"""Motores de previsão intercambiáveis.
+
+Todos seguem a mesma interface: ``ajustar(df_treino)`` recebe o DataFrame
+``ds``/``y`` e ``prever(horizonte)`` devolve a tabela no formato de
+``gerar_tabela_previsoes`` (ajuste dentro da amostra com ``horizonte`` 0 e os
+dias previstos de 1 a ``horizonte``), de forma que página, avaliação e
+backtest tratam qualquer motor do mesmo jeito.
+
+Além do Prophet, há motores leves, só com NumPy (e o Ridge do scikit-learn),
+que ajustam e preveem em poucos milissegundos. Nesses, o ajuste dentro da
+amostra é a previsão um passo à frente, e o intervalo de previsão sai do
+desvio padrão desses resíduos, alargado conforme o horizonte.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from modelo import PARAMETROS_MODELO, ajustar_modelo
+from previsoes import HORIZONTE_MAXIMO, gerar_tabela_previsoes
+
+# Mesma largura de intervalo usada no Prophet
+LARGURA_INTERVALO = PARAMETROS_MODELO['interval_width']
+
+
+class Motor:
+    """Base dos motores leves.
+
+    As subclasses implementam ``_ajustar``, ``_dentro_amostra`` (posição da
+    primeira data com previsão e os valores previstos um passo à frente) e
+    ``_futuro`` (valores previstos e fator do desvio em cada passo).
+    """
+
+    def __init__(self, **parametros):
+        self.parametros = parametros
+
+    def ajustar(self, df_treino):
+        self.ds = pd.to_datetime(df_treino['ds']).to_numpy(dtype='datetime64[ns]')
+        self.y = df_treino['y'].to_numpy(dtype='float64')
+        self._ajustar()
+        return self
+
+    def prever(self, horizonte=HORIZONTE_MAXIMO, datas=None, dentro_amostra=True):
+        """Tabela de previsões.
+
+        ``datas`` substitui os dias úteis seguintes ao treino; com
+        ``dentro_amostra=False`` só os dias previstos são devolvidos.
+        """
+        primeira, ajustados = self._dentro_amostra()
+        residuos = self.y[primeira:] - ajustados
+        desvio = float(np.std(residuos)) if len(residuos) else 0.0
+        if not dentro_amostra:
+            primeira, ajustados = len(self.y), ajustados[:0]
+
+        if datas is None:
+            datas = pd.bdate_range(pd.Timestamp(self.ds[-1]) + pd.offsets.BDay(), periods=horizonte)
+        datas = pd.DatetimeIndex(datas).to_numpy(dtype='datetime64[ns]')[:horizonte]
+        horizonte = len(datas)
+        previstos, fatores = self._futuro(horizonte)
+
+        z = NormalDist().inv_cdf(0.5 + LARGURA_INTERVALO / 2)
+        margem = np.concatenate([np.full(len(ajustados), z * desvio), z * desvio * fatores])
+        yhat = np.concatenate([ajustados, previstos])
+        return pd.DataFrame({
+            'ds': np.concatenate([self.ds[primeira:], datas]),
+            'yhat': yhat,
+            'yhat_lower': yhat - margem,
+            'yhat_upper': yhat + margem,
+            'horizonte': np.concatenate([np.zeros(len(ajustados), dtype='int64'), np.arange(1, horizonte + 1)]),
+        })
+
+
+class NaiveSazonal(Motor):
+    """Repete o valor de ``periodo`` pregões antes (``periodo=1`` é o naive simples)."""
+
+    def _ajustar(self):
+        self.periodo = int(self.parametros.get('periodo', 5))
+        if len(self.y) <= self.periodo:
+            raise ValueError(f"São necessários mais de {self.periodo} pregões no treino")
+
+    def _dentro_amostra(self):
+        return self.periodo, self.y[:-self.periodo]
+
+    def _futuro(self, horizonte):
+        passos = np.arange(1, horizonte + 1)
+        ciclos = (passos - 1) // self.periodo + 1
+        posicoes = len(self.y) - 1 + passos - self.periodo * ciclos
+        return self.y[posicoes], np.sqrt(ciclos)
+
+
+class SuavizacaoExponencial(Motor):
+    """Suavização exponencial simples; sem ``alfa``, escolhe o de menor erro um passo à frente."""
+
+    ALFAS = np.linspace(0.05, 1.0, 20)
+
+    def _nivel(self, alfa):
+        from scipy.signal import lfilter
+
+        # nivel[t] = alfa * y[t] + (1 - alfa) * nivel[t - 1], começando em y[0]
+        nivel, _ = lfilter([alfa], [1.0, alfa - 1.0], self.y, zi=[(1.0 - alfa) * self.y[0]])
+        return nivel
+
+    def _ajustar(self):
+        if len(self.y) < 2:
+            raise ValueError("São necessários ao menos 2 pregões no treino")
+        alfa = self.parametros.get('alfa')
+        if alfa is None:
+            erros = [np.sum(np.square(self.y[1:] - self._nivel(a)[:-1])) for a in self.ALFAS]
+            alfa = float(self.ALFAS[int(np.argmin(erros))])
+        self.alfa = alfa
+        self.nivel = self._nivel(alfa)
+
+    def _dentro_amostra(self):
+        return 1, self.nivel[:-1]
+
+    def _futuro(self, horizonte):
+        passos = np.arange(1, horizonte + 1)
+        return np.full(horizonte, self.nivel[-1]), np.sqrt(1 + (passos - 1) * self.alfa ** 2)
+
+
+class RidgeDefasagens(Motor):
+    """Regressão Ridge do preço sobre os ``defasagens`` pregões anteriores, prevista recursivamente."""
+
+    def _ajustar(self):
+        from sklearn.linear_model import Ridge
+
+        self.defasagens = int(self.parametros.get('defasagens', 5))
+        if len(self.y) <= self.defasagens + 1:
+            raise ValueError(f"São necessários mais de {self.defasagens + 1} pregões no treino")
+        # Janelas deslizantes sem cópia: a linha t tem y[t:t + defasagens]
+        self.janelas = np.lib.stride_tricks.sliding_window_view(self.y, self.defasagens)[:-1]
+        self.regressao = Ridge(alpha=self.parametros.get('alpha', 1.0)).fit(self.janelas, self.y[self.defasagens:])
+
+    def _dentro_amostra(self):
+        return self.defasagens, self.regressao.predict(self.janelas)
+
+    def _futuro(self, horizonte):
+        janela = list(self.y[-self.defasagens:])
+        previstos = []
+        for _ in range(horizonte):
+            previsto = float(self.regressao.coef_ @ janela[-self.defasagens:] + self.regressao.intercept_)
+            previstos.append(previsto)
+            janela.append(previsto)
+        return np.array(previstos), np.sqrt(np.arange(1, horizonte + 1))
+
+
+class MotorProphet:
+    """Adaptador do Prophet para a interface dos motores."""
+
+    def __init__(self, **parametros):
+        self.parametros = parametros
+
+    def ajustar(self, df_treino):
+        self.modelo = ajustar_modelo(df_treino, self.parametros)
+        return self
+
+    def prever(self, horizonte=HORIZONTE_MAXIMO, datas=None, dentro_amostra=True):
+        if datas is None and dentro_amostra:
+            return gerar_tabela_previsoes(self.modelo, horizonte)
+        if datas is None:
+            datas = self.modelo.make_future_dataframe(periods=horizonte, freq='B', include_history=False)['ds']
+        datas = pd.DatetimeIndex(datas)[:horizonte].to_numpy(dtype='datetime64[ns]')
+        historico = self.modelo.history['ds'].to_numpy(dtype='datetime64[ns]') if dentro_amostra else datas[:0]
+
+        previsao = self.modelo.predict(pd.DataFrame({'ds': np.concatenate([historico, datas])}))
+        previsao['horizonte'] = np.concatenate([np.zeros(len(historico), dtype='int64'), np.arange(1, len(datas) + 1)])
+        return previsao
+
+
+# Motores disponíveis: nome exibido, classe e parâmetros padrão
+# (os do Prophet vêm da configuração da busca de hiperparâmetros)
+MOTORES = {
+    'suavizacao': {'nome': 'Suavização exponencial', 'classe': SuavizacaoExponencial, 'parametros': {}},
+    'naive_sazonal': {'nome': 'Naive sazonal (semanal)', 'classe': NaiveSazonal, 'parametros': {'periodo': 5}},
+    'ridge': {'nome': 'Ridge com defasagens', 'classe': RidgeDefasagens, 'parametros': {'defasagens': 5, 'alpha': 1.0}},
+    'prophet': {'nome': 'Prophet', 'classe': MotorProphet, 'parametros': dict(PARAMETROS_MODELO)},
+}
+MOTOR_PADRAO = 'suavizacao'
+
+
+def criar_motor(motor=MOTOR_PADRAO, parametros=None):
+    """Instância de ``motor`` com ``parametros`` (ou os padrões do motor)."""
+    configuracao = MOTORES[motor]
+    return configuracao['classe'](**(configuracao['parametros'] if parametros is None else parametros))
+
+
+def prever_com_motor(motor, df_treino, parametros=None, horizonte=HORIZONTE_MAXIMO):
+    """Ajusta ``motor`` em ``df_treino`` e devolve a tabela de previsões."""
+    return criar_motor(motor, parametros).ajustar(df_treino).prever(horizonte)
@@ -0,0 +1,12 @@
+"""Páginas da aplicação.
+
+Cada página é um módulo com uma função ``renderizar()``. O ``app.py`` só
+importa o módulo da página selecionada, de forma que as dependências pesadas
+(Prophet, plotly) e a carga dos dados ficam para quando a página é aberta.
+"""
+# Título no menu -> módulo da página
+PAGINAS = {
+    "Contexto": "paginas.contexto",
+    "Dados históricos + Insigths": "paginas.historico",
+    "Modelo de previsão": "paginas.previsao",
+}
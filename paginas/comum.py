@@ -0,0 +1,49 @@
+"""Carga dos dados compartilhada pelas páginas."""
+import streamlit as st
+
+from dados import SERIE_PADRAO, SERIES, carregar_cotacoes
+from indice_precos import IndicePrecos
+from serie_precos import compartilhar
+
+# Carrega dados históricos do petróleo a partir de 2000
+# A base local é semeada pelo ipea.csv e só os dias faltantes são buscados no yfinance
+inicio = "2000-01-01"
+
+
+# Série somente leitura mapeada de cache/series, a mesma para todas as sessões; cada
+# sessão só monta views dela, sem cópias dos dados por execução
+@st.cache_resource(ttl=3600, show_spinner=False)
+def carregar_serie_precos(serie, inicio):
+    return compartilhar(carregar_cotacoes(serie, inicio), f'{serie}_{inicio}')
+
+
+# Índice de médias, mínimos e máximos por intervalo, compartilhado entre as sessões
+@st.cache_resource(show_spinner=False)
+def criar_indice_precos(serie, inicio):
+    serie_precos = carregar_serie_precos(serie, inicio)
+    return IndicePrecos(serie_precos.datas, serie_precos.precos)
+
+
+def selecionar_serie():
+    """Seletor de série na barra lateral; a escolha vale para todas as páginas."""
+    return st.sidebar.selectbox(
+        "Série", list(SERIES), index=list(SERIES).index(SERIE_PADRAO),
+        format_func=lambda serie: SERIES[serie]['nome'], key='serie',
+    )
+
+
+def obter_serie_precos(serie=SERIE_PADRAO):
+    """``SeriePrecos`` compartilhada de ``serie``."""
+    return carregar_serie_precos(serie, inicio)
+
+
+def obter_cotacoes(serie=SERIE_PADRAO):
+    """``df_cotacoes`` da sessão, apontando para a série compartilhada."""
+    return obter_serie_precos(serie).para_dataframe()
+
+
+def obter_indice_precos(df_cotacoes, serie=SERIE_PADRAO):
+    """Índice de intervalos, já com os dias novos que chegaram desde a criação."""
+    indice_precos = criar_indice_precos(serie, inicio)
+    indice_precos.sincronizar(df_cotacoes)
+    return indice_precos
@@ -0,0 +1,44 @@
+"""Página de contexto: texto estático, sem dados nem modelo."""
+import streamlit as st
+
+
+def renderizar():
+    st.title('Preço do petróleo Brent')
+    st.header('Contextualização do desafio e abordagens de análise e modelagem')
+    st.write("")
+    st.markdown("---")
+
+    st.header('Desafio')
+    st.write("""
+    <div style="text-align: justify">
+    Esta aplicação visa explorar os dados históricos de preços do petróleo Brent, fornecendo visualizações e insights sobre diversas influências, como situações geopolíticas, econômicas e a demanda global.<br><br>
+
+    Além disso, o projeto inclui o desenvolvimento de um modelo de machine learning que utiliza análise de séries temporais para prever o preço diário do petróleo contribuindo para tomadas de decisões.<br><br>
+
+    Por fim, o MVP do modelo será implantado em produção usando a ferramenta Streamlit, permitindo acesso fácil e interativo aos resultados e às previsões geradas pelo modelo.
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.write("")
+    st.markdown("---")
+    st.header('Dataset')
+    st.write("""
+    <div style="text-align: justify">
+    O conjunto de dados consiste nas colunas de data e preço do petróleo Brent e é possível explorar o histórico de preços desde janeiro de 2000 até parcial de maio de 2024.<br><br>
+
+    Esses dados foram obtidos por meio da API yfinance, utilizando o índice BZ-F como referência. Para mais informações e consulta dos dados, você pode acessar o site: http://www.ipeadata.gov.br/ExibeSerie.aspx?module=m&serid=1650971490&oper=view. 
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.write("")
+    st.markdown("---")
+    st.header('Modelo de Machine Learning Prophet')
+    st.write("""
+    <div style="text-align: justify">
+     Desenvolvido pelo Facebook com foco em séries temporais, o Prophet é uma ferramenta robusta que oferece a flexibilidade de ajustar vários parâmetros. Além disso, é capaz de lidar de forma eficaz com a sazonalidade e os feriados, tornando-o uma escolha ideal para modelagem e previsão de séries temporais complexas como o preço do petróleo Brent.<br><br>
+
+    No ajuste do modelo foi definido um intervalo de confiança de 95% (interval_width=0.95) para as previsões e a sazonalidade diária foi desconsiderada (daily_seasonality=False). O número de períodos futuros para as previsões foi determinado dinamicamente com base na interação com o usuário. Por fim, apenas os dias úteis foram considerados na frequência dos dados temporais (freq='B').<br><br>
+    
+    Como métrica de avaliação do modelo, foi adotado o MAPE (Erro Percentual Absoluto Médio), que avalia o quanto as previsões estão próximas dos valores reais em termos percentuais, e o R² (Coeficiente de Determinação), que determina se as variações nos dados são explicadas pelo modelo.
+    </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,129 @@
+"""Página de dados históricos e insights."""
+import streamlit as st
+from plotly import graph_objs as go
+
+from amostragem import reduzir_serie
+from consulta_datas import preco_em
+from dados import SERIE_PADRAO, SERIES
+from insights import exibir_insights
+from instrumentacao import etapa
+from paginas.comum import obter_indice_precos, obter_serie_precos, selecionar_serie
+from tabela import calcular_variacoes, exibir_tabela_paginada
+
+
+def renderizar():
+    serie = selecionar_serie()
+    nome_serie = SERIES[serie]['nome']
+    with etapa('carga_dados'):
+        serie_precos = obter_serie_precos(serie)
+        df_cotacoes = serie_precos.para_dataframe()
+
+    st.title(f'Conhecendo os dados históricos do preço de {nome_serie}')
+    st.write("")
+    st.write(f"<h6 style='font-weight: 300'>Nessa aba você pode explorar, realizar consultas nos dados históricos reais dos preços de {nome_serie.lower()} e ter acesso a insights!</h6>", unsafe_allow_html=True)    
+    st.write("")
+
+    # Séries sem semente local só têm dados depois da primeira carga no yfinance
+    if df_cotacoes.empty:
+        st.warning(f'Ainda não há cotações de {nome_serie} na base local.')
+        return
+    with etapa('indice_precos'):
+        indice_precos = obter_indice_precos(df_cotacoes, serie)
+
+    ## Filtrar período
+    st.markdown("---")   
+    st.write("### Consultas e visualizações")
+    st.write("")
+    st.write("###### Selecione o período que  deseja exibir")
+    primeira_data, ultima_data = serie_precos.primeira_data, serie_precos.ultima_data
+    inicio_filtro = st.date_input("Data de Início", min_value=primeira_data, max_value=ultima_data, value=primeira_data)
+    fim_filtro = st.date_input("Data de Fim", min_value=primeira_data, max_value=ultima_data, value=ultima_data)
+
+    # Recorte sem cópia da série compartilhada
+    periodo = serie_precos.intervalo(inicio_filtro, fim_filtro)
+    
+    # Cria Big numbers
+    # Calculando o preço médio, mínimo e máximo pelo índice de intervalos (tempo constante)
+    with etapa('resumo_periodo'):
+        resumo_periodo = indice_precos.intervalo(inicio_filtro, fim_filtro)
+    preco_medio = resumo_periodo['media']
+    preco_minimo = resumo_periodo['minimo']
+    preco_maximo = resumo_periodo['maximo']
+
+    # Arredondando os valores dos big numbers
+    preco_medio = round(preco_medio, 2)
+    preco_minimo = round(preco_minimo, 2)
+    preco_maximo = round(preco_maximo, 2)
+
+    # Exibindo os big numbers lado a lado
+    col1, col2, col3 = st.columns(3)
+    col1.metric(label="Preço Médio", value=preco_medio)
+    col2.metric(label="Preço Mínimo", value=preco_minimo)
+    col3.metric(label="Preço Máximo", value=preco_maximo)
+
+    # Gráfico de preços históricos
+
+    # Reduz os pontos enviados ao navegador mantendo picos e vales (LTTB);
+    # períodos curtos são exibidos com todos os pontos
+    with etapa('grafico_historico'):
+        serie_grafico = reduzir_serie(periodo.para_serie())
+
+        # Plota gráfico de linha
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=serie_grafico.index, y=serie_grafico, mode='lines', name='Preço do Petróleo'))
+
+        fig.update_layout(
+            title='Preços históricos de petróleo',
+            title_font_size=20,
+            xaxis_title='Data',
+            xaxis_hoverformat='%Y-%m-%d',
+            yaxis_title='Preço',
+            template='plotly_white'
+        )
+
+        # Exibir o gráfico Plotly
+        st.plotly_chart(fig)
+
+    # Exibir a tabela com os dados do preço do petróleo
+    # Variações calculadas só quando a tabela é exibida; a formatação vale só para a página mostrada
+    st.write("###### Visualize o detalhamento dos dados exibidos no gráfico em tabela com cálculo de variações diárias")
+    if st.checkbox('Mostrar/Esconder Tabela'):
+        with etapa('tabela_variacoes'):
+            exibir_tabela_paginada(calcular_variacoes(periodo.para_dataframe()), chave='tabela_historico')
+
+    st.write("")
+    st.write("")
+
+    ## Cria consulta de preço em um dia específico
+    st.write("###### Descubra o preço do petróleo em um dia específico")
+
+    # Exibir o calendário com as datas disponíveis
+    selected_date = st.date_input('Selecione uma data:', min_value=primeira_data.date(), max_value=ultima_data.date(), value=primeira_data.date())
+
+    # Encontra preço pra data selecionada (ou do pregão anterior, em fins de semana e feriados)
+    with etapa('consulta_data'):
+        data_pregao, preco_selecionado = preco_em(*indice_precos.vetores(), selected_date)
+
+    # Exibe o preço do petróleo para a data selecionada
+    st.write(f'O preço do petróleo em {selected_date:%Y-%m-%d} foi de ${preco_selecionado:.2f}')
+    if data_pregao.date() != selected_date:
+        st.caption(f'Não houve pregão nesta data; o preço exibido é do pregão anterior, em {data_pregao:%Y-%m-%d}.')
+
+    # Os insights comentados em insights_anos.json são do Brent
+    if serie != SERIE_PADRAO:
+        return
+
+    st.markdown("---")
+
+    # Análise ano a ano
+    st.write("### Insights dos últimos 3 anos")
+    st.write("")
+    st.write("<h6 style='font-weight: 300'>  O petróleo Brent é um tipo de petróleo de alta qualidade extraído do Mar do Norte e amplamente usado como referência internacional para precificação do petróleo.</h6>", unsafe_allow_html=True)    
+    st.write("")
+    st.write("<h6 style='font-weight: 300'>  Seu preço é influenciado por diversos fatores, incluindo eles a oferta e demanda global, movimentos geopolíticos, acordos políticos, conjuntura econômica global e flutuações de câmbio, além de eventos como desastres naturais e climáticos.</h6>", unsafe_allow_html=True)    
+    st.write("")
+
+
+    # Seções de cada ano, configuradas em insights_anos.json
+    with etapa('insights'):
+        exibir_insights(df_cotacoes, indice_precos)
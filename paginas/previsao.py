@@ -0,0 +1,220 @@
+"""Página do modelo de previsão."""
+import pandas as pd
+import streamlit as st
+from plotly import graph_objs as go
+
+from avaliacao import avaliar, detalhar
+from backtest import CORTES_PADRAO, metricas_backtest
+from dados import SERIES
+from instrumentacao import etapa
+from modelo import carregar_configuracao, chave_modelo, obter_modelo, preparar_treino
+from motores import MOTOR_PADRAO, MOTORES, prever_com_motor
+from paginas.comum import obter_cotacoes, selecionar_serie
+from previsoes import (ATRASO_MAXIMO_PUBLICACAO, HORIZONTE_MAXIMO, atraso_publicacao, consultar_previsao,
+                       ler_publicacao, obter_tabela_previsoes)
+
+
+# Modelos ajustados ficam em memória entre sessões e em disco entre reinícios
+@st.cache_resource(max_entries=4, show_spinner=False)
+def carregar_modelo(df_treino, parametros, serie):
+    return obter_modelo(df_treino, parametros, serie=serie)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def carregar_previsoes(df_treino, parametros, serie, _modelo):
+    return obter_tabela_previsoes(df_treino, parametros, _modelo, serie=serie)
+
+
+# Motores leves: ajuste e previsão em milissegundos, sem cache em disco
+@st.cache_data(max_entries=16, show_spinner=False)
+def carregar_previsoes_motor(motor, df_treino):
+    return prever_com_motor(motor, df_treino)
+
+
+# Backtest dos motores leves: cerca de um segundo, uma vez por série de dados
+@st.cache_data(max_entries=16, show_spinner=False)
+def carregar_backtest(motor, df_cotacoes, inicio):
+    return metricas_backtest(df_cotacoes, inicio, motor=motor)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def carregar_publicacao(serie):
+    return ler_publicacao(serie)
+
+
+def grafico_previsao(df_treino, previsao):
+    """Gráfico com as mesmas séries, na mesma ordem, do ``plot_plotly`` do Prophet."""
+    faixa = 'rgba(0, 114, 178, 0.2)'
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df_treino['ds'], y=df_treino['y'], mode='markers', marker=dict(color='black', size=4)))
+    fig.add_trace(go.Scatter(x=previsao['ds'], y=previsao['yhat_lower'], mode='lines', line=dict(width=0)))
+    fig.add_trace(go.Scatter(x=previsao['ds'], y=previsao['yhat'], mode='lines', line=dict(color='#0072B2'),
+                             fill='tonexty', fillcolor=faixa))
+    fig.add_trace(go.Scatter(x=previsao['ds'], y=previsao['yhat_upper'], mode='lines', line=dict(width=0),
+                             fill='tonexty', fillcolor=faixa))
+    fig.update_layout(template='plotly_white', xaxis_hoverformat='%Y-%m-%d')
+    return fig
+
+
+def renderizar():
+    serie = selecionar_serie()
+    nome_serie = SERIES[serie]['nome']
+    with etapa('carga_dados'):
+        df_cotacoes = obter_cotacoes(serie)
+
+    st.title(f'Previsão do preço do {nome_serie}')
+    st.write("")
+    st.write("<h6 style='font-weight: 300'>Nessa aba você pode prever o preço do petróleo para os próximos dias!</h6>", unsafe_allow_html=True)    
+    st.write("")
+
+    if df_cotacoes.empty:
+        st.warning(f'Ainda não há cotações de {nome_serie} na base local.')
+        return
+
+    st.markdown("---")
+
+    # Série completa, para o backtest (a do Prophet pode ser cortada na data publicada)
+    df_cotacoes_completo = df_cotacoes
+
+    n_dias = st.slider('Quantos dias você deseja prever?', 1, HORIZONTE_MAXIMO)
+    # Os motores leves respondem na hora; o Prophet é mais lento e fica como opção
+    motor = st.selectbox('Modelo de previsão', list(MOTORES), index=list(MOTORES).index(MOTOR_PADRAO),
+                         format_func=lambda motor: MOTORES[motor]['nome'], key='motor')
+
+    # DF
+    if motor == 'prophet':
+        # Usa a última previsão publicada pelo job em lote (cli.py): mesma configuração e mesmos
+        # dados, de forma que modelo e previsões são lidos do cache sem ajuste na página.
+        # Publicação atrasada (job parado) continua sendo servida, com um aviso: o Prophet
+        # não é reajustado durante a requisição. Sem publicação, usa a configuração da
+        # busca de hiperparâmetros (ou os padrões).
+        publicacao = carregar_publicacao(serie)
+        if publicacao is not None:
+            inicio_treino, parametros_modelo = publicacao['inicio'], publicacao['parametros']
+            atraso = atraso_publicacao(publicacao, df_cotacoes)
+            df_cotacoes = df_cotacoes.loc[:publicacao['ultima_data']]
+            gerado_em = pd.Timestamp(publicacao['gerado_em'])
+            st.caption(f"Previsão publicada em {gerado_em:%Y-%m-%d %H:%M}, com dados até {publicacao['ultima_data']}.")
+            if atraso > ATRASO_MAXIMO_PUBLICACAO:
+                st.warning(f"A previsão publicada não inclui os {atraso} pregões mais recentes. Ela é atualizada "
+                           "pelo job em lote (python cli.py atualizar); os outros modelos já usam todos os dados.")
+        else:
+            inicio_treino, parametros_modelo = carregar_configuracao()
+        df_treino = preparar_treino(df_cotacoes, inicio_treino)
+
+        # Reaproveita o modelo já ajustado para os mesmos dados e parâmetros
+        with etapa('ajuste_modelo'):
+            modelo = carregar_modelo(df_treino, parametros_modelo, serie)
+
+        # Consulta a previsão na tabela pré-calculada para os 7 horizontes
+        with etapa('tabela_previsoes'):
+            tabela_previsoes = carregar_previsoes(df_treino, parametros_modelo, serie, modelo)
+    else:
+        inicio_treino, _ = carregar_configuracao()
+        parametros_modelo = {'motor': motor, **MOTORES[motor]['parametros']}
+        df_treino = preparar_treino(df_cotacoes, inicio_treino)
+        with etapa('previsao_motor'):
+            tabela_previsoes = carregar_previsoes_motor(motor, df_treino)
+    previsao = consultar_previsao(tabela_previsoes, n_dias)
+
+    # Criar uma cópia do DataFrame de previsão
+    with etapa('tabela_formatada'):
+        previsao_formatada = previsao[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(n_dias).copy()
+
+        # Ajustar o formato da coluna de data
+        previsao_formatada['ds'] = previsao_formatada['ds'].dt.strftime('%Y-%m-%d')
+
+        # Arredondar as previsões
+        previsao_formatada['yhat'] = round(previsao_formatada['yhat'], 2)
+        previsao_formatada['yhat_lower'] = round(previsao_formatada['yhat_lower'], 3)
+        previsao_formatada['yhat_upper'] = round(previsao_formatada['yhat_upper'], 3)
+
+        # Exibir a tabela de previsões com cabeçalhos personalizados e formato de data ajustado
+        st.write("###### Essa é a previsão para os dias que você deseja prever:")
+        st.dataframe(previsao_formatada.rename(columns={'ds': 'Data da previsão', 'yhat': 'Previsão do preço', 'yhat_lower': 'Limite de previsão inferior', 'yhat_upper': 'Limite de previsão superior'}))
+
+
+    ######################## CRIA VISUALIZAÇÕES COM AS PREVISÕES ######################################################
+    st.markdown("---")
+    ######################## CRIA VISUALIZAÇÕES COM AS PREVISÕES ######################################################
+    with etapa('grafico_previsao'):
+        if motor == 'prophet':
+            from prophet.plot import plot_plotly
+            graph_1 = plot_plotly(modelo, previsao)
+        else:
+            graph_1 = grafico_previsao(df_treino, previsao)
+
+        # Adicionar legendas ao gráfico
+        layout = dict(
+            title='Previsão de preço do petróleo com intervalo de confiança',
+            xaxis_title='Data',
+            yaxis_title='Preço',
+            legend_title='Legenda',
+            legend=dict(
+                orientation='h',  # Posição da legenda (horizontal)
+                yanchor='bottom',
+                y=1.02,
+                xanchor='right',
+                x=1
+            )
+        )
+
+        # Atualizar o layout do gráfico
+        graph_1.update_layout(layout)
+
+        # Adicionar legendas às séries de dados
+        graph_1.data[0].name = 'Previsão'
+        graph_1.data[1].name = 'Limite de previsão inferior'
+        graph_1.data[2].name = 'Limite de previsão superior'
+
+        # Exibir o gráfico com as legendas
+        st.plotly_chart(graph_1)
+
+
+    # A decomposição em componentes só existe no Prophet
+    if motor == 'prophet':
+        with etapa('grafico_componentes'):
+            from prophet.plot import plot_components_plotly
+            graph_2 = plot_components_plotly(modelo, previsao)
+
+            # Adicionar título ao gráfico graph_2
+            graph_2.update_layout(title_text="Decomposição da Previsão: Tendência, Sazonalidade e Tendências Irregulares")
+
+            # Exibir o gráfico graph_2
+            st.plotly_chart(graph_2)
+
+
+    ###################### AVALIAÇÃO DO MODELO ########################################################################
+    # Avalia o ajuste dentro da amostra, alinhando previsão e realizado pela data
+    with etapa('avaliacao'):
+        metricas = avaliar(tabela_previsoes, df_treino, chave_modelo(df_treino, parametros_modelo))
+
+    st.markdown("---")
+    # Exibir o resultado
+    # Dentro da amostra, os motores leves são avaliados pela previsão um passo à frente e o Prophet
+    # pelos valores ajustados sobre todo o treino: só o backtest compara os motores da mesma forma
+    ajuste = 'valores ajustados sobre todo o treino' if motor == 'prophet' else 'previsões um passo à frente'
+    st.write(f"Dentro da amostra ({ajuste}), o modelo apresenta um MAPE de {metricas['mape']:.2f}% e um Coeficiente de Determinação (R-squared) de {metricas['r2']:.2f}")
+    st.write(f"RMSE de {metricas['rmse']:.2f}, MAE de {metricas['mae']:.2f} e {metricas['cobertura']:.2f}% dos valores reais dentro do intervalo de previsão")
+
+    # Backtest walk-forward: mesma avaliação para todos os motores
+    if st.checkbox(f'Selecione para comparar os modelos no backtest walk-forward ({CORTES_PADRAO} cortes, {HORIZONTE_MAXIMO} pregões à frente)'):
+        with etapa('backtest'):
+            if motor == 'prophet':
+                # O Prophet não é ajustado na página: vale o checkpoint gravado pelo backtest.py
+                metricas_backtest_motor = metricas_backtest(df_cotacoes_completo, inicio_treino, parametros_modelo, motor=motor,
+                                                            calcular=False)
+            else:
+                metricas_backtest_motor = carregar_backtest(motor, df_cotacoes_completo, inicio_treino)
+        if metricas_backtest_motor is not None:
+            st.write(f"No backtest, o modelo apresenta um MAPE de {metricas_backtest_motor['mape']:.2f}%, RMSE de {metricas_backtest_motor['rmse']:.2f}, "
+                     f"MAE de {metricas_backtest_motor['mae']:.2f} e {metricas_backtest_motor['cobertura']:.2f}% dos valores reais dentro do intervalo de previsão")
+        elif motor == 'prophet':
+            st.info("O backtest do Prophet ainda não foi calculado para estes dados: rode python backtest.py --motor prophet.")
+        else:
+            st.info("Não há pregões suficientes para o backtest.")
+
+    # Exibir a tabela com a opção de expandir/recolher
+    if st.checkbox('Selecione para visualizar o detalhamento da Previsão x Realizado diário'):
+        with etapa('detalhamento'):
+            st.write(detalhar(tabela_previsoes, df_treino))
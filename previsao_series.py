@@ -0,0 +1,117 @@
+"""Previsão de várias séries de preço em paralelo.
+
+As datas e os preços de todas as séries são copiados uma única vez para dois
+blocos de memória compartilhada; cada processo do pool enxerga esses blocos
+como arrays NumPy somente leitura, sem receber cópias dos dados. Cada série é
+ajustada (com os caches de modelo e de previsões) num processo, e o resultado
+volta como um único DataFrame em formato longo.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from avaliacao import avaliar
+from modelo import chave_modelo, obter_modelo, preparar_treino
+from previsoes import obter_tabela_previsoes
+
+COLUNAS_PREVISAO = ['serie', 'ds', 'horizonte', 'yhat', 'yhat_lower', 'yhat_upper']
+
+# Arrays compartilhados, visíveis em cada processo do pool
+_memorias = []
+_ds = None
+_y = None
+_posicoes = None
+
+
+def _compartilhar(series):
+    """Copia as séries para memória compartilhada; retorna os blocos e as posições."""
+    tamanhos = [len(df) for df in series.values()]
+    limites = np.concatenate([[0], np.cumsum(tamanhos)]).astype(int)
+    total = int(limites[-1])
+
+    memoria_ds = SharedMemory(create=True, size=max(total, 1) * 8)
+    memoria_y = SharedMemory(create=True, size=max(total, 1) * 8)
+    ds = np.ndarray((total,), dtype='datetime64[ns]', buffer=memoria_ds.buf)
+    y = np.ndarray((total,), dtype='float64', buffer=memoria_y.buf)
+
+    posicoes = {}
+    for (serie, df), inicio, fim in zip(series.items(), limites[:-1], limites[1:]):
+        ds[inicio:fim] = df.index.to_numpy(dtype='datetime64[ns]')
+        y[inicio:fim] = df['Preço'].to_numpy(dtype='float64')
+        posicoes[serie] = (int(inicio), int(fim))
+    return memoria_ds, memoria_y, total, posicoes
+
+
+def _iniciar_processo(nome_ds, nome_y, total, posicoes):
+    global _ds, _y, _posicoes
+    memoria_ds = SharedMemory(name=nome_ds)
+    memoria_y = SharedMemory(name=nome_y)
+    # Mantém as referências vivas enquanto o processo existir; quem remove os blocos é o processo principal
+    _memorias[:] = [memoria_ds, memoria_y]
+
+    _ds = np.ndarray((total,), dtype='datetime64[ns]', buffer=memoria_ds.buf)
+    _y = np.ndarray((total,), dtype='float64', buffer=memoria_y.buf)
+    _ds.flags.writeable = False
+    _y.flags.writeable = False
+    _posicoes = posicoes
+
+    from cmdstanpy.utils import get_logger
+    get_logger().setLevel(logging.WARNING)
+
+
+def _prever_serie(serie, inicio, parametros):
+    comeco, fim = _posicoes[serie]
+    df_cotacoes = pd.DataFrame({'Preço': _y[comeco:fim]}, index=pd.DatetimeIndex(_ds[comeco:fim], name='Date'))
+    df_treino = preparar_treino(df_cotacoes, inicio)
+    chave = chave_modelo(df_treino, parametros)
+
+    modelo = obter_modelo(df_treino, parametros, serie=serie)
+    tabela = obter_tabela_previsoes(df_treino, parametros, modelo, serie=serie)
+    return {
+        'serie': serie,
+        'chave': chave,
+        'modo_ajuste': modelo.modo_ajuste,
+        'ultima_data': df_treino['ds'].iloc[-1],
+        'metricas': avaliar(tabela, df_treino, chave),
+        'tabela': tabela,
+    }
+
+
+def prever_series(series, inicio, parametros, processos=None, ao_concluir=None):
+    """Ajusta e prevê cada série de ``series`` (nome -> ``df_cotacoes``).
+
+    Retorna ``(previsoes, resultados)``: as previsões de todas as séries em
+    formato longo (colunas ``COLUNAS_PREVISAO``, ``horizonte`` 0 nas datas de
+    treino) e, por série, chave do modelo, modo de ajuste, última data,
+    métricas e tabela completa. Séries sem dados são ignoradas.
+    """
+    series = {serie: df for serie, df in series.items() if len(df)}
+    if not series:
+        return pd.DataFrame(columns=COLUNAS_PREVISAO), {}
+
+    memoria_ds, memoria_y, total, posicoes = _compartilhar(series)
+    resultados = {}
+    try:
+        argumentos = (memoria_ds.name, memoria_y.name, total, posicoes)
+        trabalhadores = min(processos or os.cpu_count() or 1, len(series))
+        with ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_processo, initargs=argumentos) as pool:
+            tarefas = [pool.submit(_prever_serie, serie, inicio, parametros) for serie in series]
+            for tarefa in as_completed(tarefas):
+                resultado = tarefa.result()
+                resultados[resultado['serie']] = resultado
+                if ao_concluir is not None:
+                    ao_concluir(resultado)
+    finally:
+        for memoria in (memoria_ds, memoria_y):
+            memoria.close()
+            memoria.unlink()
+
+    previsoes = pd.concat(
+        [resultados[serie]['tabela'].assign(serie=serie)[COLUNAS_PREVISAO] for serie in series if serie in resultados],
+        ignore_index=True,
+    )
+    return previsoes, resultados
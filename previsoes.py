@@ -0,0 +1,107 @@
+"""Tabela de previsões pré-calculadas para os horizontes de 1 a 7 dias úteis.
+
+Como o horizonte da página é limitado a 7 dias, a previsão é feita uma única
+vez por dia novo de dados (a chave da tabela é a mesma do modelo ajustado) e
+guardada em Parquet. A página só consulta as linhas do horizonte escolhido.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dados import PASTA_CACHE, SERIE_PADRAO, gravar_atomico, gravar_texto
+from modelo import chave_modelo, limpar_cache, obter_modelo
+
+HORIZONTE_MAXIMO = 7
+
+PASTA_PREVISOES = os.path.join(PASTA_CACHE, "previsoes")
+LIMITE_PREVISOES = 20
+
+
+def gerar_tabela_previsoes(modelo, horizonte=HORIZONTE_MAXIMO):
+    """Prevê o ajuste dentro da amostra e os ``horizonte`` dias úteis seguintes.
+
+    A coluna ``horizonte`` vale 0 nas datas de treino e de 1 a ``horizonte``
+    nos dias previstos, em ordem crescente.
+    """
+    futuro = modelo.make_future_dataframe(periods=horizonte, freq='B')
+    previsao = modelo.predict(futuro)
+
+    n_treino = len(previsao) - horizonte
+    previsao['horizonte'] = np.concatenate([np.zeros(n_treino, dtype='int64'), np.arange(1, horizonte + 1)])
+    return previsao
+
+
+def obter_tabela_previsoes(df_treino, parametros=None, modelo=None, pasta=PASTA_PREVISOES, limite=LIMITE_PREVISOES,
+                           serie=SERIE_PADRAO):
+    """Devolve a tabela de previsões de ``df_treino``, calculando-a só uma vez."""
+    caminho = os.path.join(pasta, chave_modelo(df_treino, parametros) + '.parquet')
+    if os.path.exists(caminho):
+        os.utime(caminho)
+        return pd.read_parquet(caminho)
+
+    if modelo is None:
+        modelo = obter_modelo(df_treino, parametros, serie=serie)
+    tabela = gerar_tabela_previsoes(modelo)
+
+    gravar_atomico(caminho, tabela.to_parquet)
+    limpar_cache(pasta, limite, '.parquet')
+    return tabela
+
+
+def consultar_previsao(tabela, n_dias):
+    """Linhas equivalentes a ``predict`` com ``periods=n_dias``."""
+    fim = np.searchsorted(tabela['horizonte'].to_numpy(), n_dias, side='right')
+    return tabela.iloc[:fim]
+
+
+# Última previsão publicada pelo job em lote (cli.py), uma pasta por série
+PASTA_PUBLICACAO = os.path.join(PASTA_CACHE, "publicado")
+ARQUIVO_PUBLICACAO = "ultima.json"
+# Pregões da série carregada ainda não publicados a partir dos quais a página avisa que a previsão está atrasada
+ATRASO_MAXIMO_PUBLICACAO = 3
+
+
+def publicar(tabela, metricas, chave, inicio, parametros, ultima_data, serie=SERIE_PADRAO, pasta=PASTA_PUBLICACAO):
+    """Grava o manifesto da última previsão e um CSV com os dias previstos.
+
+    A tabela completa e o modelo continuam nos caches, identificados por
+    ``chave``; o manifesto diz à página qual configuração e dados usar.
+    """
+    pasta = os.path.join(pasta, serie)
+    futuro = tabela.loc[tabela['horizonte'] > 0, ['ds', 'horizonte', 'yhat', 'yhat_lower', 'yhat_upper']]
+    gravar_atomico(os.path.join(pasta, 'previsao.csv'),
+                   lambda temporario: futuro.to_csv(temporario, index=False, date_format='%Y-%m-%d'))
+
+    manifesto = {
+        'chave': chave,
+        'inicio': inicio,
+        'parametros': parametros,
+        'ultima_data': pd.Timestamp(ultima_data).strftime('%Y-%m-%d'),
+        'gerado_em': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'metricas': metricas,
+    }
+    gravar_texto(os.path.join(pasta, ARQUIVO_PUBLICACAO), json.dumps(manifesto, indent=2))
+    return manifesto
+
+
+def ler_publicacao(serie=SERIE_PADRAO, pasta=PASTA_PUBLICACAO):
+    """Manifesto da última previsão publicada para ``serie``, ou ``None``."""
+    try:
+        with open(os.path.join(pasta, serie, ARQUIVO_PUBLICACAO)) as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def atraso_publicacao(publicacao, df_cotacoes):
+    """Pregões de ``df_cotacoes`` posteriores à última data usada na ``publicacao``."""
+    ultima_data = pd.Timestamp(publicacao['ultima_data'])
+    return len(df_cotacoes) - int(df_cotacoes.index.searchsorted(ultima_data, side='right'))
+
+
+def publicar_todas(previsoes, pasta=PASTA_PUBLICACAO):
+    """Grava as previsões de todas as séries (formato longo) em um único Parquet."""
+    gravar_atomico(os.path.join(pasta, 'previsoes.parquet'),
+                   lambda temporario: previsoes.to_parquet(temporario, index=False))
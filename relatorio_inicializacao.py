@@ -0,0 +1,114 @@
+"""Relatório de tempo de inicialização da aplicação.
+
+Mede, cada um num processo Python novo:
+- o tempo de importação das dependências e dos módulos de cada página
+  (via ``python -X importtime``);
+- o tempo da primeira renderização de cada página, executando o ``app.py``
+  com o ``AppTest`` do Streamlit (sem servidor).
+
+Uso:
+    python relatorio_inicializacao.py [--json relatorio.json] [--sem-paginas]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from paginas import PAGINAS
+
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+MODULOS = [
+    'streamlit',
+    'pandas',
+    'numpy',
+    'plotly.graph_objs',
+    'yfinance',
+    'prophet',
+    *PAGINAS.values(),
+]
+
+# Executa o app.py e abre a página pedida, medindo as duas renderizações
+_SCRIPT_PAGINA = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=600)
+inicio = time.perf_counter()
+at.run()
+abertura = time.perf_counter() - inicio
+inicio = time.perf_counter()
+if {pagina!r} != at.sidebar.selectbox[0].value:
+    at.sidebar.selectbox[0].select({pagina!r}).run()
+pagina = time.perf_counter() - inicio
+erros = [e.value for e in at.exception]
+print(abertura, pagina, len(erros))
+"""
+
+
+def tempo_importacao(modulo):
+    """Tempo cumulativo (s) de importação de ``modulo`` num processo novo."""
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=PASTA_PROJETO, capture_output=True, text=True,
+    )
+    if resultado.returncode != 0:
+        return None
+    for linha in reversed(resultado.stderr.splitlines()):
+        partes = [parte.strip() for parte in linha.split('|')]
+        if len(partes) == 3 and partes[2] == modulo:
+            return int(partes[1]) / 1e6
+    return None
+
+
+def tempo_pagina(pagina):
+    """Primeira abertura do app e primeira renderização de ``pagina`` (s)."""
+    script = _SCRIPT_PAGINA.format(app=os.path.join(PASTA_PROJETO, 'app.py'), pagina=pagina)
+    inicio = time.perf_counter()
+    resultado = subprocess.run([sys.executable, '-c', script], cwd=PASTA_PROJETO, capture_output=True, text=True)
+    total = time.perf_counter() - inicio
+    try:
+        abertura, renderizacao, erros = resultado.stdout.split()[-3:]
+        return {'processo': total, 'abertura': float(abertura), 'pagina': float(renderizacao), 'erros': int(erros)}
+    except ValueError:
+        return {'processo': total, 'abertura': None, 'pagina': None, 'erros': None}
+
+
+def gerar_relatorio(medir_paginas=True):
+    relatorio = {'importacao': {modulo: tempo_importacao(modulo) for modulo in MODULOS}}
+    if medir_paginas:
+        relatorio['paginas'] = {pagina: tempo_pagina(pagina) for pagina in PAGINAS}
+    return relatorio
+
+
+def _formatar(segundos):
+    return '     -' if segundos is None else f'{segundos:6.3f}'
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Tempo de importação e de inicialização das páginas")
+    parser.add_argument('--json', default=None, help="grava o relatório neste arquivo JSON")
+    parser.add_argument('--sem-paginas', action='store_true', help="mede só as importações")
+    args = parser.parse_args(argumentos)
+
+    relatorio = gerar_relatorio(not args.sem_paginas)
+
+    print("Importação (s, processo novo)")
+    for modulo, segundos in relatorio['importacao'].items():
+        print(f"  {_formatar(segundos)}  {modulo}")
+
+    if 'paginas' in relatorio:
+        print("\nPrimeira renderização (s): abertura do app | página | processo")
+        for pagina, tempos in relatorio['paginas'].items():
+            erros = f"  ({tempos['erros']} erro(s))" if tempos['erros'] else ''
+            print(f"  {_formatar(tempos['abertura'])} | {_formatar(tempos['pagina'])} | "
+                  f"{_formatar(tempos['processo'])}  {pagina}{erros}")
+
+    if args.json:
+        with open(args.json, 'w') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Série de preços compartilhada, somente leitura e mapeável em memória.
+
+Datas e preços ficam num único arquivo ``.npy`` de duas linhas de 8 bytes
+(datas em nanossegundos e os bits dos preços em float64), aberto com
+``mmap_mode='r'``: as sessões do Streamlit compartilham o mesmo objeto e
+processos diferentes que abrem o mesmo arquivo compartilham as páginas do
+sistema operacional. Cada linha é vista como um array contíguo, sem cópia.
+
+Recortes por data são views (busca binária e fatia), e os ``df_cotacoes``
+montados a partir da série apontam para os mesmos arrays.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from dados import PASTA_CACHE, gravar_atomico
+
+PASTA_SERIES = os.path.join(PASTA_CACHE, "series")
+
+
+def _somente_leitura(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class SeriePrecos:
+    """Datas e preços em arrays somente leitura, com recortes sem cópia."""
+
+    def __init__(self, datas, precos):
+        datas = np.asarray(datas, dtype='datetime64[ns]')
+        precos = np.asarray(precos, dtype='float64')
+        if datas.shape != precos.shape:
+            raise ValueError("Datas e preços precisam ter o mesmo tamanho")
+        self.datas = _somente_leitura(datas)
+        self.precos = _somente_leitura(precos)
+
+    @classmethod
+    def de_dataframe(cls, df_cotacoes):
+        return cls(df_cotacoes.index.to_numpy(dtype='datetime64[ns]'), df_cotacoes['Preço'].to_numpy(dtype='float64'))
+
+    @classmethod
+    def abrir(cls, caminho):
+        """Abre a série gravada em ``caminho`` mapeada em memória."""
+        linhas = np.load(caminho, mmap_mode='r')
+        return cls(linhas[0].view('datetime64[ns]'), linhas[1].view('float64'))
+
+    def salvar(self, caminho):
+        # Grava em arquivo temporário e renomeia: quem já mapeou o arquivo anterior continua lendo o antigo
+        linhas = np.empty((2, len(self)), dtype='int64')
+        linhas[0] = self.datas.view('int64')
+        linhas[1] = self.precos.view('int64')
+
+        def gravar(temporario):
+            # Pelo arquivo aberto: com um caminho, o np.save acrescentaria ".npy" ao temporário
+            with open(temporario, 'wb') as arquivo:
+                np.save(arquivo, linhas)
+        gravar_atomico(caminho, gravar)
+
+    def __len__(self):
+        return len(self.precos)
+
+    @property
+    def primeira_data(self):
+        return pd.Timestamp(self.datas[0]) if len(self) else None
+
+    @property
+    def ultima_data(self):
+        return pd.Timestamp(self.datas[-1]) if len(self) else None
+
+    def intervalo(self, inicio=None, fim=None):
+        """View da série entre ``inicio`` e ``fim`` (inclusive), como em ``df.loc[inicio:fim]``."""
+        i = 0 if inicio is None else np.searchsorted(self.datas, np.datetime64(pd.Timestamp(inicio), 'ns'), side='left')
+        j = len(self) if fim is None else np.searchsorted(self.datas, np.datetime64(pd.Timestamp(fim), 'ns'), side='right')
+        j = max(i, j)
+        return SeriePrecos(self.datas[i:j], self.precos[i:j])
+
+    def para_serie(self):
+        """``pd.Series`` de preços indexada por ``Date``, apontando para os mesmos arrays."""
+        indice = pd.DatetimeIndex(self.datas, name='Date', copy=False)
+        return pd.Series(self.precos, index=indice, name='Preço', copy=False)
+
+    def para_dataframe(self):
+        """``df_cotacoes`` (coluna ``Preço`` indexada por ``Date``) sem cópia dos dados."""
+        return self.para_serie().to_frame()
+
+
+def compartilhar(df_cotacoes, nome, pasta=PASTA_SERIES):
+    """Série de ``df_cotacoes`` mapeada do arquivo ``nome`` em ``pasta``.
+
+    O arquivo só é regravado se os dados mudaram, de forma que processos
+    com os mesmos dados continuam mapeando o mesmo arquivo.
+    """
+    caminho = os.path.join(pasta, nome + '.npy')
+    serie = SeriePrecos.de_dataframe(df_cotacoes)
+    try:
+        existente = SeriePrecos.abrir(caminho)
+        if np.array_equal(existente.datas, serie.datas) and np.array_equal(existente.precos, serie.precos):
+            return existente
+    except (FileNotFoundError, ValueError):
+        pass
+    serie.salvar(caminho)
+    return SeriePrecos.abrir(caminho)
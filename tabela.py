@@ -0,0 +1,55 @@
+"""Tabela paginada de preços com variações diárias.
+
+As variações são calculadas de forma vetorizada e guardadas como números; a
+formatação (duas casas, sinal de %) só é aplicada às linhas da página exibida,
+e só essas linhas são enviadas ao navegador.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+LINHAS_POR_PAGINA = 50
+
+FORMATOS = {
+    'Preço': '{:.2f}',
+    'Variação Diária': '{:.2f}',
+    'Variação Diária (%)': '{:.2f}%',
+}
+
+
+def calcular_variacoes(df_precos):
+    """Preço com as variações absoluta e percentual em relação ao dia anterior."""
+    precos = df_precos['Preço'].to_numpy(dtype='float64')
+    variacao = np.empty_like(precos)
+    variacao_percentual = np.empty_like(precos)
+    variacao[:1] = np.nan
+    variacao_percentual[:1] = np.nan
+    np.subtract(precos[1:], precos[:-1], out=variacao[1:])
+    np.divide(variacao[1:], precos[:-1], out=variacao_percentual[1:])
+    variacao_percentual[1:] *= 100
+
+    return pd.DataFrame(
+        {'Preço': precos, 'Variação Diária': variacao, 'Variação Diária (%)': variacao_percentual},
+        index=df_precos.index,
+    )
+
+
+def pagina_tabela(df, pagina, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Linhas da ``pagina`` (a partir de 1), com a formatação de exibição."""
+    inicio = (pagina - 1) * linhas_por_pagina
+    trecho = df.iloc[inicio:inicio + linhas_por_pagina]
+    if isinstance(trecho.index, pd.DatetimeIndex):
+        trecho = trecho.set_axis(trecho.index.strftime('%Y-%m-%d'))
+    return trecho.style.format(FORMATOS, na_rep='nan')
+
+
+def exibir_tabela_paginada(df, chave='tabela', linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Exibe ``df`` em páginas de ``linhas_por_pagina`` linhas."""
+    total_paginas = max(1, math.ceil(len(df) / linhas_por_pagina))
+    pagina = st.number_input(
+        f'Página (de {total_paginas})', min_value=1, max_value=total_paginas, value=1, step=1, key=f'{chave}_pagina'
+    )
+    st.dataframe(pagina_tabela(df, int(pagina), linhas_por_pagina))
+    st.caption(f'{len(df)} linhas')